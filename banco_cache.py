@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Caché en disco para las conversiones del banco de preguntas
+Guarda el texto extraído de cada página de un PDF para no volver a
+decodificar el documento cuando solo cambia el parser, y las materias ya
+convertidas de cada sección del TXT para no volver a procesarlas
+"""
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+
+from banco_modelo import Materia
+
+DEFAULT_CACHE_DIR = Path('.cache_banco')
+
+# Segundos que una conexión espera a que otro proceso suelte la escritura
+ESPERA_BLOQUEO = 30
+
+# Páginas (o bytes de texto) que se juntan en memoria antes de escribirlas en
+# una transacción: pocas transacciones cortas sin que la memoria crezca con el PDF
+PAGINAS_POR_LOTE = 64
+BYTES_POR_LOTE = 4 << 20
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS documentos (
+    doc_hash TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    num_paginas INTEGER NOT NULL,
+    PRIMARY KEY (doc_hash, backend)
+);
+CREATE TABLE IF NOT EXISTS paginas (
+    doc_hash TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    pagina INTEGER NOT NULL,
+    page_hash TEXT NOT NULL,
+    texto TEXT NOT NULL,
+    PRIMARY KEY (doc_hash, backend, pagina)
+);
+CREATE INDEX IF NOT EXISTS paginas_por_contenido ON paginas (page_hash, backend);
+CREATE TABLE IF NOT EXISTS secciones (
+    clave TEXT PRIMARY KEY,
+    fuente TEXT NOT NULL,
+    materias TEXT NOT NULL
+);
+"""
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """SHA-256 del contenido de un archivo, leído por bloques"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def hash_bytes(data):
+    """SHA-256 de un bloque de bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def version_parser():
+    """Identifica la versión del parser
+
+    Las secciones guardadas dependen de cómo se leen las líneas (banco_lector),
+    de cómo se parsean (banco_parser) y de cómo se arman y serializan las
+    materias (banco_modelo): un cambio en cualquiera de los tres las invalida.
+    """
+    import banco_lector
+    import banco_modelo
+    import banco_parser
+    h = hashlib.sha256()
+    for modulo in (banco_parser, banco_modelo, banco_lector):
+        h.update(hash_file(modulo.__file__).encode('ascii'))
+    return h.hexdigest()
+
+
+class CacheBanco:
+    """Caché SQLite de texto por página y de secciones ya convertidas
+
+    Las páginas se guardan por (hash del PDF, backend, número de página) y
+    además se indexan por el hash del contenido de la página, de modo que si
+    el PDF cambia solo se vuelven a extraer las páginas modificadas. Varios
+    procesos pueden usar la misma caché: con WAL las lecturas no esperan a
+    las escrituras, y las páginas de un PDF se escriben por lotes de hasta
+    PAGINAS_POR_LOTE páginas o BYTES_POR_LOTE bytes, cada uno en una
+    transacción corta.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.cache_dir / 'cache.db'), timeout=ESPERA_BLOQUEO)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(_ESQUEMA)
+        self._paginas = []  # páginas todavía no escritas
+        self._bytes_paginas = 0
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def iter_paginas_documento(self, doc_hash, backend):
+        """Iterador sobre el texto de las páginas de un PDF ya visto, o None si no está completo"""
+        row = self.conn.execute(
+            'SELECT num_paginas FROM documentos WHERE doc_hash = ? AND backend = ?',
+            (doc_hash, backend)).fetchone()
+        if row is None:
+            return None
+        (guardadas,) = self.conn.execute(
+            'SELECT COUNT(*) FROM paginas WHERE doc_hash = ? AND backend = ?',
+            (doc_hash, backend)).fetchone()
+        if guardadas != row[0]:
+            return None
+        cursor = self.conn.execute(
+            'SELECT texto FROM paginas WHERE doc_hash = ? AND backend = ? ORDER BY pagina',
+            (doc_hash, backend))
+        return (texto for (texto,) in cursor)
+
+    def texto_pagina(self, page_hash, backend):
+        """Texto de una página con el mismo contenido y recursos (banco_pdf.hash_pagina), venga del PDF que venga"""
+        row = self.conn.execute(
+            'SELECT texto FROM paginas WHERE page_hash = ? AND backend = ? LIMIT 1',
+            (page_hash, backend)).fetchone()
+        return row[0] if row else None
+
+    def tiene_pagina(self, page_hash, backend):
+        """Hay una página con el mismo contenido en la caché"""
+        return self.conn.execute(
+            'SELECT 1 FROM paginas WHERE page_hash = ? AND backend = ? LIMIT 1',
+            (page_hash, backend)).fetchone() is not None
+
+    def _volcar_paginas(self):
+        """Inserta las páginas pendientes; va dentro de una transacción"""
+        paginas, self._paginas, self._bytes_paginas = self._paginas, [], 0
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO paginas (doc_hash, backend, pagina, page_hash, texto) VALUES (?, ?, ?, ?, ?)',
+            paginas)
+
+    def guardar_pagina(self, doc_hash, backend, pagina, page_hash, texto):
+        """Guarda el texto de una página; se escribe junto con las siguientes, por lotes"""
+        self._paginas.append((doc_hash, backend, pagina, page_hash, texto))
+        self._bytes_paginas += len(texto)
+        if len(self._paginas) >= PAGINAS_POR_LOTE or self._bytes_paginas >= BYTES_POR_LOTE:
+            with self.conn:
+                self._volcar_paginas()
+
+    def cerrar_documento(self, doc_hash, backend, num_paginas):
+        """Escribe las páginas pendientes y marca el PDF como completo"""
+        with self.conn:
+            self._volcar_paginas()
+            self.conn.execute(
+                'INSERT OR REPLACE INTO documentos (doc_hash, backend, num_paginas) VALUES (?, ?, ?)',
+                (doc_hash, backend, num_paginas))
+
+    def materias_seccion(self, clave):
+        """Materias (banco_modelo.Materia) ya convertidas de una sección, o None si no está en la caché"""
+        row = self.conn.execute(
+            'SELECT materias FROM secciones WHERE clave = ?', (clave,)).fetchone()
+        return [Materia.from_dict(materia) for materia in json.loads(row[0])] if row else None
+
+    def guardar_seccion(self, clave, fuente, materias):
+        """Guarda las materias convertidas de una sección"""
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO secciones (clave, fuente, materias) VALUES (?, ?, ?)',
+                (clave, fuente, json.dumps([materia.to_dict() for materia in materias], ensure_ascii=False)))
+
+    def podar_secciones(self, fuente, claves_vigentes):
+        """Borra las secciones de una fuente que ya no aparecen en ella"""
+        claves_vigentes = set(claves_vigentes)
+        obsoletas = [(clave,) for (clave,) in self.conn.execute(
+            'SELECT clave FROM secciones WHERE fuente = ?', (fuente,))
+            if clave not in claves_vigentes]
+        with self.conn:
+            self.conn.executemany('DELETE FROM secciones WHERE clave = ?', obsoletas)
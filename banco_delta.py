@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Delta del banco de preguntas respecto de la conversión anterior
+Compara cada pregunta nueva con la del banco_preguntas.json anterior, por
+materia y número, y guarda solo las preguntas y respuestas agregadas,
+eliminadas o modificadas en <salida>.delta.json. La base de datos de
+server.js puede aplicar ese delta en lugar de recargarse entera, y así
+conserva las respuestas marcadas como correctas
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+from banco_sqlite import DEFAULT_DB_PATH
+
+
+def delta_path(output_path):
+    """Ruta del delta de una salida"""
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.stem + '.delta.json')
+
+
+def _respuestas(respuestas):
+    """{opcion: texto}; una opción repetida se ignora, igual que en la base de datos"""
+    opciones = {}
+    for opcion, texto in respuestas:
+        opciones.setdefault(opcion, texto)
+    return opciones
+
+
+def cargar_anteriores(path):
+    """Preguntas de una salida anterior (json, compact o ndjson) y su SHA-256
+
+    Devuelve ({(materia, numero): (texto, {opcion: texto})}, sha256), o
+    ({}, None) si el archivo no existe. Como en la base de datos, solo
+    cuenta la primera pregunta con cada materia y número.
+    """
+    path = Path(path)
+    if not path.exists():
+        return {}, None
+    datos = path.read_bytes()
+    sha256 = hashlib.sha256(datos).hexdigest()
+
+    try:
+        documento = json.loads(datos)
+    except json.JSONDecodeError:
+        documento = None
+    if isinstance(documento, dict) and 'banco_preguntas' in documento:
+        preguntas = ((materia['materia'], pregunta)
+                     for materia in documento['banco_preguntas'] for pregunta in materia['preguntas'])
+    else:
+        # NDJSON: una pregunta por línea, con su materia. Solo '\n' separa registros:
+        # splitlines también corta en U+2028, U+2029 o U+0085, que pueden estar en los textos
+        preguntas = ((registro['materia'], registro)
+                     for registro in map(json.loads, filter(str.strip, datos.decode('utf-8').split('\n'))))
+
+    anteriores = {}
+    for materia, pregunta in preguntas:
+        clave = (materia, pregunta['numero'])
+        if clave not in anteriores:
+            anteriores[clave] = (pregunta['texto'],
+                                 _respuestas((r['opcion'], r['texto']) for r in pregunta['respuestas']))
+    return anteriores, sha256
+
+
+class EscritorDelta:
+    """Calcula el delta mientras se escribe la salida nueva
+
+    Misma interfaz que banco_writer.EscritorBanco. Hay que crearlo antes de
+    empezar a escribir la salida nueva encima de la anterior. Cada pregunta
+    se busca en un diccionario con las anteriores, así el delta es lineal en
+    el tamaño del banco; al cerrar, las que no aparecieron son las eliminadas.
+    """
+
+    formato = 'delta'
+
+    def __init__(self, path, anterior_path):
+        self.path = Path(path)
+        self.anterior_path = Path(anterior_path)
+        self._anteriores, self.sha256_anterior = cargar_anteriores(self.anterior_path)
+        self._vistas = set()
+        self.agregadas = []
+        self.modificadas = []
+        self.eliminadas = []
+        self.sin_cambios = 0
+        self._cerrado = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+    def escribir_pregunta(self, clave_materia, materia_nombre, pregunta):
+        """Compara una pregunta (banco_modelo.Pregunta) con la anterior"""
+        clave = (materia_nombre, pregunta.numero)
+        if clave in self._vistas:
+            return
+        self._vistas.add(clave)
+
+        anterior = self._anteriores.pop(clave, None)
+        if anterior is None:
+            registro = {'materia': materia_nombre}
+            registro.update(pregunta.to_dict())
+            self.agregadas.append(registro)
+            return
+
+        texto, respuestas = anterior
+        cambio = {}
+        if pregunta.texto != texto:
+            cambio['texto'] = pregunta.texto
+        nuevas = _respuestas((r.opcion, r.texto) for r in pregunta.respuestas)
+        agregadas = [{'opcion': o, 'texto': t} for o, t in nuevas.items() if o not in respuestas]
+        modificadas = [{'opcion': o, 'texto': t} for o, t in nuevas.items()
+                       if o in respuestas and respuestas[o] != t]
+        eliminadas = [o for o in respuestas if o not in nuevas]
+        if agregadas:
+            cambio['respuestas_agregadas'] = agregadas
+        if modificadas:
+            cambio['respuestas_modificadas'] = modificadas
+        if eliminadas:
+            cambio['respuestas_eliminadas'] = eliminadas
+
+        if cambio:
+            self.modificadas.append({'materia': materia_nombre, 'numero': pregunta.numero, **cambio})
+        else:
+            self.sin_cambios += 1
+
+    def escribir_materia(self, materia):
+        """Compara una materia completa (banco_modelo.Materia)"""
+        for pregunta in materia.preguntas:
+            self.escribir_pregunta(None, materia.materia, pregunta)
+
+    def close(self):
+        """Escribe el delta"""
+        if self._cerrado:
+            return
+        self._cerrado = True
+        self.eliminadas = [{'materia': materia, 'numero': numero} for materia, numero in self._anteriores]
+        self._anteriores = {}
+        delta = {
+            'anterior': self.anterior_path.name,
+            'sha256_anterior': self.sha256_anterior,
+            'totales': self.totales(),
+            'agregadas': self.agregadas,
+            'eliminadas': self.eliminadas,
+            'modificadas': self.modificadas,
+        }
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(delta, f, ensure_ascii=False, indent=2)
+
+    def totales(self):
+        return {
+            'agregadas': len(self.agregadas),
+            'eliminadas': len(self.eliminadas),
+            'modificadas': len(self.modificadas),
+            'sin_cambios': self.sin_cambios,
+        }
+
+
+def _id_pregunta(conn, materia, numero):
+    fila = conn.execute(
+        'SELECT p.id FROM preguntas p JOIN materias m ON m.id = p.materia_id '
+        'WHERE m.nombre = ? AND p.numero = ?', (materia, numero)).fetchone()
+    return fila[0] if fila else None
+
+
+def _respuestas_unicas(respuestas):
+    return [{'opcion': o, 'texto': t} for o, t in _respuestas((r['opcion'], r['texto']) for r in respuestas).items()]
+
+
+def _insertar_respuestas(conn, pregunta_id, respuestas):
+    conn.executemany('INSERT INTO respuestas (pregunta_id, opcion, texto, es_correcta) VALUES (?, ?, ?, 0)',
+                     [(pregunta_id, r['opcion'], r['texto']) for r in respuestas])
+
+
+def aplicar_delta_sqlite(delta, db_path=DEFAULT_DB_PATH):
+    """Aplica un delta a la base de datos de server.js en una sola transacción
+
+    La base de datos tiene que estar cargada con el banco anterior del delta;
+    si una pregunta a modificar o eliminar no está, o una a agregar ya está,
+    no se aplica nada y se lanza ValueError. Las respuestas que no cambian
+    conservan es_correcta. Devuelve los totales del delta.
+    """
+    conn = sqlite3.connect(str(db_path), isolation_level=None)
+    try:
+        conn.execute('BEGIN')
+        materias_tocadas = set()
+
+        for pregunta in delta['eliminadas']:
+            pregunta_id = _id_pregunta(conn, pregunta['materia'], pregunta['numero'])
+            if pregunta_id is None:
+                raise ValueError(f"No está la pregunta {pregunta['numero']} de {pregunta['materia']}")
+            conn.execute('DELETE FROM respuestas WHERE pregunta_id = ?', (pregunta_id,))
+            conn.execute('DELETE FROM preguntas WHERE id = ?', (pregunta_id,))
+            materias_tocadas.add(pregunta['materia'])
+
+        for pregunta in delta['modificadas']:
+            pregunta_id = _id_pregunta(conn, pregunta['materia'], pregunta['numero'])
+            if pregunta_id is None:
+                raise ValueError(f"No está la pregunta {pregunta['numero']} de {pregunta['materia']}")
+            if 'texto' in pregunta:
+                conn.execute('UPDATE preguntas SET texto = ? WHERE id = ?', (pregunta['texto'], pregunta_id))
+            conn.executemany('DELETE FROM respuestas WHERE pregunta_id = ? AND opcion = ?',
+                             [(pregunta_id, opcion) for opcion in pregunta.get('respuestas_eliminadas', [])])
+            conn.executemany('UPDATE respuestas SET texto = ? WHERE pregunta_id = ? AND opcion = ?',
+                             [(r['texto'], pregunta_id, r['opcion'])
+                              for r in pregunta.get('respuestas_modificadas', [])])
+            _insertar_respuestas(conn, pregunta_id, pregunta.get('respuestas_agregadas', []))
+
+        for pregunta in delta['agregadas']:
+            if _id_pregunta(conn, pregunta['materia'], pregunta['numero']) is not None:
+                raise ValueError(f"Ya está la pregunta {pregunta['numero']} de {pregunta['materia']}")
+            fila = conn.execute('SELECT id FROM materias WHERE nombre = ?', (pregunta['materia'],)).fetchone()
+            materia_id = fila[0] if fila else conn.execute(
+                'INSERT INTO materias (nombre) VALUES (?)', (pregunta['materia'],)).lastrowid
+            pregunta_id = conn.execute('INSERT INTO preguntas (materia_id, numero, texto) VALUES (?, ?, ?)',
+                                       (materia_id, pregunta['numero'], pregunta['texto'])).lastrowid
+            _insertar_respuestas(conn, pregunta_id, _respuestas_unicas(pregunta['respuestas']))
+
+        # Materias que se quedaron sin preguntas
+        conn.executemany('DELETE FROM materias WHERE nombre = ? AND NOT EXISTS '
+                         '(SELECT 1 FROM preguntas WHERE materia_id = materias.id)',
+                         [(materia,) for materia in materias_tocadas])
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+    finally:
+        conn.close()
+    return delta['totales']
+
+
+def parse_args(argv=None):
+    """Argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Aplica un delta del banco (--delta) a la base de datos SQLite")
+    parser.add_argument('delta', type=Path, help="delta generado con --delta (p. ej. banco_preguntas.delta.json)")
+    parser.add_argument('--sqlite', type=Path, default=DEFAULT_DB_PATH, metavar='PATH',
+                        help=f"base de datos de server.js (por defecto: {DEFAULT_DB_PATH})")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        with open(args.delta, 'r', encoding='utf-8') as f:
+            delta = json.load(f)
+        totales = aplicar_delta_sqlite(delta, args.sqlite)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"❌ Error al aplicar el delta: {e}")
+        sys.exit(1)
+    print(f"✅ Delta aplicado a {args.sqlite}: {totales['agregadas']} agregadas, "
+          f"{totales['eliminadas']} eliminadas, {totales['modificadas']} modificadas")
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Detección de preguntas duplicadas y casi duplicadas durante la conversión
+Cada pregunta se compara con las anteriores sin recorrerlas todas: las
+idénticas una vez normalizado el texto (sin mayúsculas, tildes ni signos, y
+con las respuestas en cualquier orden) se encuentran por su huella, y las
+parecidas con MinHash y LSH sobre los tríos de palabras de la pregunta y sus
+respuestas. Los candidatos que da el LSH se confirman con la similitud de
+Jaccard exacta, así el costo es lineal en el tamaño del banco
+"""
+
+import json
+import re
+import unicodedata
+import zlib
+from array import array
+from hashlib import blake2b
+from itertools import repeat
+from pathlib import Path
+
+from banco_modelo import Materia
+
+# Similitud de Jaccard mínima (entre los tríos de palabras del texto y, por separado,
+# entre los de las respuestas) para considerar duplicadas dos preguntas
+UMBRAL = 0.8
+
+# MinHash de una sola permutación: los tríos se reparten en BINS y se guarda el
+# mínimo de cada uno. El LSH usa bandas de FILAS bins; con 10 bandas de 3, un par
+# con similitud 0.8 es candidato el 99.9% de las veces, uno con 0.5 el 74% y uno
+# con 0.2 el 8% (los candidatos que no llegan al umbral se descartan al confirmar)
+BINS = 32
+FILAS = 3
+
+# Modos de --duplicados
+MODOS = ('marcar', 'fusionar')
+
+# Separa las respuestas entre sí, así ningún trío mezcla dos respuestas
+_SEPARADOR = '\x01'
+_NO_ALFANUMERICO = re.compile(r'[\W_]+')
+_BIN = (BINS - 1).__and__
+_32_BITS = 0xFFFFFFFF.__and__
+
+
+def duplicados_path(output_path):
+    """Ruta del reporte de duplicados de una salida"""
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.stem + '.duplicados.json')
+
+
+def normalizar_palabra(palabra):
+    """Palabra sin tildes ni signos ('¿Qué' -> 'que'); '' si no queda nada"""
+    palabra = unicodedata.normalize('NFKD', palabra.lower())
+    palabra = ''.join(c for c in palabra if not unicodedata.combining(c))
+    return _NO_ALFANUMERICO.sub('', palabra)
+
+
+def _trios(ids):
+    """Hashes (de 32 bits) de los tríos de palabras seguidas (o de toda la secuencia, si es más corta)"""
+    if len(ids) >= 3:
+        return set(map(_32_BITS, map(hash, zip(ids, ids[1:], ids[2:]))))
+    return {_32_BITS(hash(tuple(ids)))} if ids else set()
+
+
+def _jaccard(trios, otros):
+    """Similitud de Jaccard entre un conjunto de tríos y los de un original (sin repetidos)"""
+    if not trios and not otros:
+        return 1.0
+    comunes = len(trios.intersection(otros))
+    return comunes / (len(trios) + len(otros) - comunes)
+
+
+class DetectorDuplicados:
+    """Detecta, pregunta a pregunta, las que repiten a una anterior
+
+    Uso:
+        detector = DetectorDuplicados(duplicados_path(output_path))
+        for indice_materia, materia_nombre, pregunta in iter_preguntas(lines):
+            if not detector.revisar(materia_nombre, pregunta):
+                ...                                    # primera aparición
+        detector.close()                               # escribe el reporte
+
+    Una pregunta es duplicada de la primera anterior con la que coincide
+    (la más parecida, si hay varias); así cada grupo del reporte tiene un
+    original y sus repeticiones, y con fusionar solo se escribe el original.
+    Las preguntas sin ninguna palabra no se comparan. En memoria queda, por
+    cada original, su texto, sus tríos y sus bandas (unos 1.5 KB por pregunta).
+    """
+
+    def __init__(self, path, umbral=UMBRAL, fusionar=False):
+        if not 0 < umbral <= 1:
+            raise ValueError(f"El umbral de similitud debe estar entre 0 y 1: {umbral}")
+        self.path = Path(path)
+        self.umbral = umbral
+        self.fusionar = fusionar
+        self.total_preguntas = 0
+        self.exactas = 0
+        self.similares = 0
+        # Las palabras se normalizan una sola vez: palabra tal como aparece -> id (0 si no queda nada)
+        self._vocabulario = {_SEPARADOR: zlib.crc32(_SEPARADOR.encode())}
+        self._huellas = {}                                  # huella -> índice del original
+        self._bandas = [{} for _ in range(BINS // FILAS)]  # valor de la banda -> índice o [índices]
+        self._originales = []   # (materia, numero, texto, tríos del texto, tríos de las respuestas)
+        self._grupos = {}       # índice del original -> [duplicadas]
+        self._cerrado = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+    @property
+    def duplicadas(self):
+        return self.exactas + self.similares
+
+    def _ids(self, texto):
+        """Ids de las palabras de un texto"""
+        palabras = texto.split()
+        vocabulario = self._vocabulario
+        for palabra in set(palabras).difference(vocabulario):
+            normalizada = normalizar_palabra(palabra)
+            vocabulario[palabra] = zlib.crc32(normalizada.encode()) if normalizada else 0
+        return list(filter(None, map(vocabulario.__getitem__, palabras)))
+
+    def revisar(self, materia_nombre, pregunta):
+        """Registra una pregunta (banco_modelo.Pregunta); True si es duplicada de una anterior"""
+        self.total_preguntas += 1
+        ids_texto = self._ids(pregunta.texto)
+        # Las respuestas se ordenan para que no importe el orden de las opciones
+        ids_respuestas = self._ids(f' {_SEPARADOR} '.join(sorted(r.texto for r in pregunta.respuestas)))
+        if not ids_texto and len(ids_respuestas) <= ids_respuestas.count(self._vocabulario[_SEPARADOR]):
+            return False
+
+        huella = blake2b(array('I', ids_texto + [0] + ids_respuestas).tobytes(), digest_size=16).digest()
+        original = self._huellas.get(huella)
+        if original is not None:
+            self.exactas += 1
+            self._agregar_duplicada(original, materia_nombre, pregunta, 1.0)
+            return True
+
+        # La firma es de todos los tríos; ordenados de mayor a menor, al armar el
+        # diccionario gana el último, que es el mínimo de cada bin. Los bins vacíos
+        # toman el mínimo de todos: si no, dos preguntas cortas cualesquiera caerían
+        # en la misma banda solo por tener vacíos los mismos bins
+        trios_texto = _trios(ids_texto)
+        trios_respuestas = _trios(ids_respuestas)
+        trios = sorted(trios_texto | trios_respuestas, reverse=True)
+        minimos = dict(zip(map(_BIN, trios), trios))
+        firma = list(map(minimos.get, range(BINS), repeat(trios[-1])))
+        bandas = list(map(hash, zip(*[iter(firma)] * FILAS)))
+
+        candidatos = set()
+        for cubeta in map(dict.get, self._bandas, bandas):
+            if cubeta is not None:
+                candidatos.update(cubeta if isinstance(cubeta, list) else (cubeta,))
+        # El texto y las respuestas tienen que parecerse cada uno por su lado: las
+        # preguntas que comparten las opciones y cambian una palabra clave del
+        # texto ("programación funcional" / "imperativa") no son la misma
+        mejor, similitud = None, 0.0
+        for candidato in sorted(candidatos):
+            _, _, _, otros_texto, otros_respuestas = self._originales[candidato]
+            parecido = min(_jaccard(trios_texto, otros_texto), _jaccard(trios_respuestas, otros_respuestas))
+            if parecido >= self.umbral and parecido > similitud:
+                mejor, similitud = candidato, parecido
+        if mejor is not None:
+            self.similares += 1
+            self._agregar_duplicada(mejor, materia_nombre, pregunta, similitud)
+            return True
+
+        # Original: queda disponible para las siguientes
+        indice = len(self._originales)
+        self._originales.append((materia_nombre, pregunta.numero, pregunta.texto,
+                                 array('I', trios_texto), array('I', trios_respuestas)))
+        self._huellas[huella] = indice
+        for cubetas, banda in zip(self._bandas, bandas):
+            cubeta = cubetas.get(banda)
+            if cubeta is None:
+                cubetas[banda] = indice
+            elif isinstance(cubeta, list):
+                cubeta.append(indice)
+            else:
+                cubetas[banda] = [cubeta, indice]
+        return False
+
+    def _agregar_duplicada(self, original, materia_nombre, pregunta, similitud):
+        self._grupos.setdefault(original, []).append({
+            'materia': materia_nombre,
+            'numero': pregunta.numero,
+            'texto': pregunta.texto,
+            'similitud': round(similitud, 3),
+        })
+
+    def revisar_materia(self, materia):
+        """Registra las preguntas de una materia (banco_modelo.Materia)
+
+        Devuelve la materia tal cual o, con fusionar, sin las duplicadas.
+        """
+        preguntas = [p for p in materia.preguntas if not self.revisar(materia.materia, p)]
+        if not self.fusionar or len(preguntas) == len(materia.preguntas):
+            return materia
+        return Materia(materia.materia, preguntas)
+
+    def totales(self):
+        return {
+            'total_preguntas': self.total_preguntas,
+            'duplicadas': self.duplicadas,
+            'exactas': self.exactas,
+            'similares': self.similares,
+            'grupos': len(self._grupos),
+        }
+
+    def close(self):
+        """Escribe el reporte"""
+        if self._cerrado:
+            return
+        self._cerrado = True
+        grupos = []
+        for original in sorted(self._grupos):
+            materia, numero, texto, _, _ = self._originales[original]
+            grupos.append({'materia': materia, 'numero': numero, 'texto': texto,
+                           'duplicadas': self._grupos[original]})
+        reporte = {
+            'umbral': self.umbral,
+            'fusionadas': self.fusionar,
+            'totales': self.totales(),
+            'grupos': grupos,
+        }
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Banco de preguntas fragmentado: un archivo por materia y un manifiesto
+Cada materia se guarda en su propio JSON (compacto) dentro de un directorio,
+así quien practica una materia carga solo esa. Las materias se serializan y
+escriben en hilos mientras el parser sigue con la siguiente. El manifiesto
+(manifest.json) tiene los totales y, por materia, su archivo, cantidad de
+preguntas y respuestas, tamaño y SHA-256: una materia que no cambió conserva
+su hash (y su archivo no se vuelve a escribir), así se puede cachear
+"""
+
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from json.encoder import encode_basestring
+from pathlib import Path
+
+from banco_modelo import EscritorPorMaterias
+
+MANIFIESTO = 'manifest.json'
+VERSION = 1
+
+# Hilos que serializan y escriben materias, y materias pendientes por hilo como
+# máximo (así la memoria no crece si el disco va más lento que el parser)
+HILOS = 4
+PENDIENTES_POR_HILO = 2
+
+_NO_ALFANUMERICO = re.compile(r'[^a-z0-9]+')
+
+
+def nombre_archivo(materia_nombre):
+    """Nombre del archivo de una materia ('Base De Datos' -> 'base-de-datos.json')"""
+    nombre = unicodedata.normalize('NFKD', materia_nombre).encode('ascii', 'ignore').decode('ascii')
+    nombre = _NO_ALFANUMERICO.sub('-', nombre.lower()).strip('-')
+    return f"{nombre or 'materia'}.json"
+
+
+def cargar_manifiesto(directorio):
+    """Manifiesto de un directorio fragmentado, o None si no hay"""
+    try:
+        with open(Path(directorio) / MANIFIESTO, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def json_materia(materia_nombre, preguntas):
+    """Materia como JSON compacto, igual a json.dumps(separators=(',', ':'), ensure_ascii=False)
+
+    Como banco_writer.bloque_json, se arma directamente desde los registros,
+    sin pasar por to_dict: tarda la mitad.
+    """
+    partes = ['{"materia":', encode_basestring(materia_nombre), ',"preguntas":[']
+    separador = ''
+    for pregunta in preguntas:
+        partes += [separador, '{"numero":', encode_basestring(pregunta.numero),
+                   ',"texto":', encode_basestring(pregunta.texto), ',"respuestas":[']
+        partes.append(','.join(['{"opcion":' + encode_basestring(r.opcion) + ',"texto":'
+                                + encode_basestring(r.texto) + '}' for r in pregunta.respuestas]))
+        partes.append(']}')
+        separador = ','
+    partes.append(']}')
+    return ''.join(partes)
+
+
+def _temporal(path):
+    return path.with_name(path.name + '.tmp')
+
+
+def _escribir_fragmento(path, materia_nombre, preguntas, anteriores, atomico):
+    """Serializa y escribe una materia; devuelve su entrada del manifiesto y el temporal escrito (o None)"""
+    datos = json_materia(materia_nombre, preguntas).encode('utf-8')
+    sha256 = hashlib.sha256(datos).hexdigest()
+    anterior = anteriores.get(path.name)
+    # Sin cambios: el archivo queda como estaba (misma fecha de modificación)
+    temporal = None
+    if anterior is None or anterior.get('sha256') != sha256 or not _mismo_tamano(path, len(datos)):
+        # Con atomico el archivo reemplaza al anterior recién en EscritorFragmentado.close
+        temporal = _temporal(path) if atomico else None
+        with open(temporal or path, 'wb') as f:
+            f.write(datos)
+    return temporal, {
+        'materia': materia_nombre,
+        'archivo': path.name,
+        'total_preguntas': len(preguntas),
+        'total_respuestas': sum(len(p.respuestas) for p in preguntas),
+        'bytes': len(datos),
+        'sha256': sha256,
+    }
+
+
+def _mismo_tamano(path, tamano):
+    try:
+        return path.stat().st_size == tamano
+    except OSError:
+        return False
+
+
+class EscritorFragmentado(EscritorPorMaterias):
+    """Escribe el banco en un directorio con un JSON por materia y su manifiesto
+
+    Las preguntas de cada materia se juntan en memoria hasta que empieza la
+    siguiente; entonces la materia pasa a un hilo que la serializa, calcula
+    su hash y la escribe.
+    Dos materias con el mismo nombre van a archivos distintos ('-2', '-3'...).
+    El manifiesto se escribe al cerrar, después de todas las materias; los
+    archivos de materias del manifiesto anterior que ya no están se borran.
+    Con atomico las materias se escriben en <archivo>.tmp y reemplazan a las
+    anteriores todas juntas al cerrar, justo antes del manifiesto; si la
+    conversión falla se borran y el directorio queda como estaba.
+    """
+
+    formato = 'fragmentado'
+
+    def __init__(self, directorio, atomico=False, hilos=HILOS):
+        super().__init__()
+        self.directorio = Path(directorio)
+        self.atomico = atomico
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        anterior = cargar_manifiesto(self.directorio) or {}
+        self._anteriores = {m['archivo']: m for m in anterior.get('materias', [])}
+        self._pool = ThreadPoolExecutor(max_workers=hilos)
+        self._pendientes = deque()
+        self._max_pendientes = hilos * PENDIENTES_POR_HILO
+        self._entradas = []   # futures con la entrada del manifiesto de cada materia, en orden
+        self._archivos = set()
+        self._materia_nombre = None
+        self._preguntas = None
+        self._cerrado = False
+        self.total_preguntas = 0
+        self.manifiesto = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # Quedan el manifiesto y las materias anteriores
+            self._cerrado = True
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._borrar_temporales()
+
+    @property
+    def total_materias(self):
+        return len(self._entradas) + (self._preguntas is not None)
+
+    def _archivo(self, materia_nombre):
+        nombre = nombre_archivo(materia_nombre)
+        base, n = nombre[:-len('.json')], 1
+        while nombre in self._archivos or nombre == MANIFIESTO:
+            n += 1
+            nombre = f"{base}-{n}.json"
+        self._archivos.add(nombre)
+        return self.directorio / nombre
+
+    def _cerrar_materia(self):
+        if self._preguntas is None:
+            return
+        if len(self._pendientes) >= self._max_pendientes:
+            self._pendientes.popleft().result()
+        future = self._pool.submit(_escribir_fragmento, self._archivo(self._materia_nombre),
+                                   self._materia_nombre, self._preguntas, self._anteriores, self.atomico)
+        self._pendientes.append(future)
+        self._entradas.append(future)
+        self._preguntas = None
+
+    def _borrar_temporales(self):
+        if self.atomico:
+            for nombre in self._archivos:
+                _temporal(self.directorio / nombre).unlink(missing_ok=True)
+
+    def _abrir_materia(self, materia_nombre):
+        self._cerrar_materia()
+        self._materia_nombre = materia_nombre
+        self._preguntas = []
+
+    def _agregar_pregunta(self, materia_nombre, pregunta):
+        self._preguntas.append(pregunta)
+        self.total_preguntas += 1
+
+    def escribir_materia(self, materia):
+        """Escribe una materia completa (banco_modelo.Materia), sin pasar pregunta por pregunta"""
+        if not materia.preguntas:
+            return
+        self._materia_actual = self._nueva_clave()
+        self._hay_materia = True
+        self._abrir_materia(materia.materia)
+        self._preguntas.extend(materia.preguntas)
+        self.total_preguntas += len(materia.preguntas)
+
+    def close(self):
+        """Espera a que se escriban todas las materias y escribe el manifiesto"""
+        if self._cerrado:
+            return
+        self._cerrado = True
+        try:
+            self._cerrar_materia()
+            escritas = [future.result() for future in self._entradas]
+        except BaseException:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._borrar_temporales()
+            raise
+        self._pool.shutdown(wait=True)
+
+        materias = []
+        for temporal, entrada in escritas:
+            if temporal is not None:
+                os.replace(temporal, self.directorio / entrada['archivo'])
+            materias.append(entrada)
+
+        self.manifiesto = {
+            'version': VERSION,
+            'total_materias': len(materias),
+            'total_preguntas': sum(m['total_preguntas'] for m in materias),
+            'total_respuestas': sum(m['total_respuestas'] for m in materias),
+            'bytes': sum(m['bytes'] for m in materias),
+            'materias': materias,
+        }
+        path = self.directorio / MANIFIESTO
+        ruta = path.with_name(path.name + '.tmp') if self.atomico else path
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump(self.manifiesto, f, ensure_ascii=False, indent=2)
+        if self.atomico:
+            os.replace(ruta, path)
+
+        # Materias que ya no están en el banco (solo nombres de archivo, sin rutas)
+        for archivo in set(self._anteriores) - self._archivos:
+            if archivo == Path(archivo).name and archivo.endswith('.json') and archivo != MANIFIESTO:
+                (self.directorio / archivo).unlink(missing_ok=True)
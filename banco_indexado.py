@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Banco de preguntas en formato binario indexado
+El archivo tiene una cabecera con la posición de cada materia y de cada
+pregunta, así una materia o una pregunta se leen sin decodificar el resto.
+El lector abre el archivo con mmap: solo se leen del disco las páginas que
+se tocan.
+
+Formato (enteros little-endian):
+    cabecera   'BPIX', versión, materias, preguntas, posición de cada tabla
+    registros  por materia su nombre y luego sus preguntas; cada cadena va
+               como longitud (u32) + UTF-8 y cada pregunta es numero, texto,
+               cantidad de respuestas (u32) y opcion/texto de cada una
+    preguntas  (posición u64, longitud u32) de cada pregunta, en orden
+    materias   (posición del nombre u64, primera pregunta u32, total u32)
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+from banco_modelo import EscritorPorMaterias, Materia, Pregunta, Respuesta
+
+MAGIA = b'BPIX'
+VERSION = 1
+
+_CABECERA = struct.Struct('<4sHHIIQQ')
+_LONGITUD = struct.Struct('<I')
+_PREGUNTA = struct.Struct('<QI')
+_MATERIA = struct.Struct('<QII')
+
+
+def _cadena(texto):
+    datos = texto.encode('utf-8')
+    return _LONGITUD.pack(len(datos)) + datos
+
+
+def _registro(pregunta):
+    partes = [_cadena(pregunta.numero), _cadena(pregunta.texto), _LONGITUD.pack(len(pregunta.respuestas))]
+    for respuesta in pregunta.respuestas:
+        partes.append(_cadena(respuesta.opcion))
+        partes.append(_cadena(respuesta.texto))
+    return b''.join(partes)
+
+
+class EscritorIndexado(EscritorPorMaterias):
+    """Escribe el banco en formato indexado pregunta a pregunta
+
+    El nombre de cada materia y los registros de sus preguntas se escriben
+    al llegar; las tablas de posiciones, que ocupan 12 bytes por pregunta,
+    se escriben al cerrar.
+    Con atomico el archivo se escribe en <path>.tmp y reemplaza al anterior
+    recién al cerrarse.
+    """
+
+    formato = 'indexado'
+
+    def __init__(self, path, atomico=False):
+        super().__init__()
+        self.path = Path(path)
+        self.atomico = atomico
+        self.total_preguntas = 0
+        self._ruta = self.path.with_name(self.path.name + '.tmp') if atomico else self.path
+        self._f = open(self._ruta, 'wb')
+        # La cabecera queda en cero (archivo inválido) hasta el close
+        self._f.write(bytes(_CABECERA.size))
+        self._posicion = _CABECERA.size
+        self._posiciones = array('Q')
+        self._longitudes = array('I')
+        self._materias = []  # [posición del nombre, primera pregunta, total]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._f.close()
+            if self.atomico:
+                self._ruta.unlink(missing_ok=True)
+
+    @property
+    def total_materias(self):
+        return len(self._materias)
+
+    def _escribir(self, datos):
+        self._f.write(datos)
+        self._posicion += len(datos)
+
+    def _abrir_materia(self, materia_nombre):
+        self._materias.append([self._posicion, self.total_preguntas, 0])
+        self._escribir(_cadena(materia_nombre))
+
+    def _agregar_pregunta(self, materia_nombre, pregunta):
+        registro = _registro(pregunta)
+        self._posiciones.append(self._posicion)
+        self._longitudes.append(len(registro))
+        self._escribir(registro)
+        self._materias[-1][2] += 1
+        self.total_preguntas += 1
+
+    def close(self):
+        """Escribe las tablas de posiciones y la cabecera"""
+        if self._f.closed:
+            return
+        pos_preguntas = self._posicion
+        for posicion, longitud in zip(self._posiciones, self._longitudes):
+            self._escribir(_PREGUNTA.pack(posicion, longitud))
+        pos_materias = self._posicion
+        for materia in self._materias:
+            self._escribir(_MATERIA.pack(*materia))
+        self._f.seek(0)
+        self._f.write(_CABECERA.pack(MAGIA, VERSION, 0, self.total_materias, self.total_preguntas,
+                                     pos_preguntas, pos_materias))
+        self._f.close()
+        if self.atomico:
+            os.replace(self._ruta, self.path)
+
+
+class BancoIndexado:
+    """Lector de un banco en formato indexado
+
+    Uso:
+        with BancoIndexado('banco_preguntas.bpx') as banco:
+            banco.materias                       # nombres, en orden
+            banco.materia('Base De Datos')       # banco_modelo.Materia
+            banco.pregunta('Base De Datos', 12)  # banco_modelo.Pregunta
+
+    Al abrir solo se leen la cabecera y los nombres de las materias. Las
+    materias se buscan por nombre exacto (la primera con ese nombre) o por
+    índice; una materia o pregunta que no existe lanza KeyError.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            if self.path.stat().st_size < _CABECERA.size:
+                raise ValueError(f"{self.path} no es un banco indexado")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magia, version, _, self.total_materias, self.total_preguntas, self._pos_preguntas, pos_materias = \
+            _CABECERA.unpack_from(self._mm, 0)
+        if magia != MAGIA:
+            self.close()
+            raise ValueError(f"{self.path} no es un banco indexado (o no se terminó de escribir)")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"{self.path}: versión {version} del formato indexado no soportada")
+
+        self._materias = [_MATERIA.unpack_from(self._mm, pos_materias + i * _MATERIA.size)
+                          for i in range(self.total_materias)]
+        self.materias = [self._leer_cadena(posicion)[0] for posicion, _, _ in self._materias]
+        self._numeros = {}  # índice de materia -> {numero: índice de pregunta}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._mm.close()
+
+    def _leer_cadena(self, posicion):
+        (longitud,) = _LONGITUD.unpack_from(self._mm, posicion)
+        inicio = posicion + _LONGITUD.size
+        return str(self._mm[inicio:inicio + longitud], 'utf-8'), inicio + longitud
+
+    def _indice_materia(self, materia):
+        if isinstance(materia, int):
+            if not 0 <= materia < self.total_materias:
+                raise KeyError(materia)
+            return materia
+        try:
+            return self.materias.index(materia)
+        except ValueError:
+            raise KeyError(materia) from None
+
+    def _posicion_pregunta(self, indice):
+        return _PREGUNTA.unpack_from(self._mm, self._pos_preguntas + indice * _PREGUNTA.size)[0]
+
+    def pregunta_en(self, indice):
+        """Pregunta por su posición en todo el banco (0 es la primera)"""
+        if not 0 <= indice < self.total_preguntas:
+            raise IndexError(indice)
+        numero, posicion = self._leer_cadena(self._posicion_pregunta(indice))
+        texto, posicion = self._leer_cadena(posicion)
+        (total,) = _LONGITUD.unpack_from(self._mm, posicion)
+        posicion += _LONGITUD.size
+        respuestas = []
+        for _ in range(total):
+            opcion, posicion = self._leer_cadena(posicion)
+            texto_respuesta, posicion = self._leer_cadena(posicion)
+            respuestas.append(Respuesta(opcion, texto_respuesta))
+        return Pregunta(numero, texto, respuestas)
+
+    def rango_materia(self, materia):
+        """Índices (range) de las preguntas de una materia, para pregunta_en"""
+        _, primera, total = self._materias[self._indice_materia(materia)]
+        return range(primera, primera + total)
+
+    def materia(self, materia):
+        """Materia completa, leyendo solo sus preguntas"""
+        indice = self._indice_materia(materia)
+        return Materia(self.materias[indice],
+                       [self.pregunta_en(i) for i in self.rango_materia(indice)])
+
+    def pregunta(self, materia, numero):
+        """Pregunta de una materia por su número (la primera, si el número se repite)"""
+        indice = self._indice_materia(materia)
+        numeros = self._numeros.get(indice)
+        if numeros is None:
+            # Solo se lee el número al comienzo de cada registro de la materia
+            numeros = {}
+            for i in self.rango_materia(indice):
+                numeros.setdefault(self._leer_cadena(self._posicion_pregunta(i))[0], i)
+            self._numeros[indice] = numeros
+        try:
+            return self.pregunta_en(numeros[str(numero)])
+        except KeyError:
+            raise KeyError((self.materias[indice], str(numero))) from None
+
+
+def parse_args(argv=None):
+    """Argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Consulta un banco de preguntas en formato indexado")
+    parser.add_argument('banco', type=Path, help="archivo indexado (generado con --indexado)")
+    parser.add_argument('materia', nargs='?', help="nombre o índice de la materia (sin él, lista las materias)")
+    parser.add_argument('numero', nargs='?', help="número de la pregunta (sin él, toda la materia)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        with BancoIndexado(args.banco) as banco:
+            if args.materia is None:
+                for i, nombre in enumerate(banco.materias):
+                    print(f"{i:>3}  {nombre} ({len(banco.rango_materia(i))} preguntas)")
+                sys.exit(0)
+            materia = int(args.materia) if args.materia.isdigit() else args.materia
+            if args.numero is None:
+                resultado = banco.materia(materia).to_dict()
+            else:
+                resultado = banco.pregunta(materia, args.numero).to_dict()
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    except KeyError as e:
+        print(f"❌ Error: No se encontró {e}")
+        sys.exit(1)
+    print(json.dumps(resultado, ensure_ascii=False, indent=2))
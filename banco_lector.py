@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lectura de bancos TXT con mmap
+El archivo se mapea en memoria y se decodifica por bloques recién cuando se
+recorre, con los mismos saltos de línea universales que open() en modo
+texto (\\n, \\r\\n y \\r). Las secciones "Banco de Preguntas" se ubican sobre
+los bytes sin decodificar, así se puede ir directo a una sección sin leer
+las anteriores
+"""
+
+import io
+import mmap
+import re
+from pathlib import Path
+
+from banco_parser import DIALECTO_TXT, abre_seccion, esperando_texto_tras
+
+# Tamaño aproximado de cada bloque que se decodifica de una vez
+TAMANO_BLOQUE = 1 << 20
+
+# Candidatas a cabecera ("Banco de Preguntas" en cualquier combinación de mayúsculas);
+# cada una se confirma con las mismas reglas que iter_secciones. Sin re.IGNORECASE
+# la búsqueda es el doble de rápida
+_RE_CANDIDATA = re.compile(rb' [Dd][Ee] [Pp][Rr][Ee][Gg][Uu][Nn][Tt][Aa]')
+
+# madvise solo existe en algunos sistemas (no en Windows)
+_MADV_DONTNEED = getattr(mmap, 'MADV_DONTNEED', None)
+
+
+class LectorTXT:
+    """TXT en UTF-8 abierto con mmap
+
+    Uso:
+        with LectorTXT(txt_path) as lector:
+            for line in lector:                              # como un archivo abierto
+                ...
+            for inicio, fin in lector.secciones():           # rangos de bytes
+                lineas = lector.iter_lineas(inicio, fin)
+
+    Las líneas terminan en '\\n' como las de open(); un error de
+    codificación aparece como UnicodeDecodeError al llegar al bloque.
+    """
+
+    def __init__(self, path, dialecto=DIALECTO_TXT):
+        self.path = Path(path)
+        self.dialecto = dialecto
+        with open(self.path, 'rb') as f:
+            # mmap no acepta archivos vacíos
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.path.stat().st_size else b''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._mm)
+
+    def __iter__(self):
+        return self.iter_lineas()
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+
+    def _liberar(self, inicio, fin):
+        """Saca de la memoria residente las páginas de un rango ya leído
+
+        Siguen en la caché de archivos del sistema; si se vuelven a tocar se
+        leen de allí. Sin esto el RSS crecería hasta el tamaño del archivo.
+        """
+        if _MADV_DONTNEED is not None and isinstance(self._mm, mmap.mmap):
+            inicio -= inicio % mmap.PAGESIZE
+            fin -= fin % mmap.PAGESIZE
+            if fin > inicio:
+                self._mm.madvise(_MADV_DONTNEED, inicio, fin - inicio)
+
+    def leer(self, inicio=0, fin=None):
+        """Bytes sin decodificar de un rango (p. ej. una sección, para hashearla)"""
+        fin = len(self._mm) if fin is None else fin
+        datos = self._mm[inicio:fin]
+        self._liberar(inicio, fin)
+        return datos
+
+    def iter_bloques(self, inicio=0, fin=None, tamano=TAMANO_BLOQUE):
+        """Texto decodificado de un rango, en bloques que terminan en fin de línea"""
+        fin = len(self._mm) if fin is None else fin
+        while inicio < fin:
+            corte = self._mm.find(b'\n', min(inicio + tamano, fin) - 1, fin)
+            corte = fin if corte < 0 else corte + 1
+            bloque = str(self._mm[inicio:corte], 'utf-8')
+            self._liberar(inicio, corte)
+            yield bloque
+            inicio = corte
+
+    def iter_lineas(self, inicio=0, fin=None):
+        """Líneas de un rango, decodificadas bloque a bloque"""
+        for bloque in self.iter_bloques(inicio, fin):
+            # newline=None traduce \r\n y \r a \n, igual que open() en modo texto
+            yield from io.StringIO(bloque, newline=None)
+
+    def _inicio_linea(self, posicion):
+        return max(self._mm.rfind(b'\n', 0, posicion), self._mm.rfind(b'\r', 0, posicion)) + 1
+
+    def _linea(self, inicio):
+        fin = len(self._mm)
+        for salto in (b'\n', b'\r'):
+            encontrado = self._mm.find(salto, inicio, fin)
+            if encontrado >= 0:
+                fin = encontrado
+        return str(self._mm[inicio:fin], 'utf-8').strip()
+
+    def _linea_anterior(self, inicio):
+        """Inicio de la línea anterior a la que empieza en inicio, o None"""
+        if inicio == 0:
+            return None
+        fin = inicio - 1
+        if self._mm[fin:inicio] == b'\n' and self._mm[fin - 1:fin] == b'\r':
+            fin -= 1
+        return self._inicio_linea(fin)
+
+    def _esperando_texto(self, inicio):
+        """Estado esperando_texto de iter_secciones al llegar a la línea que empieza en inicio
+
+        Solo depende de los "Pregunta X" sin texto consecutivos que la
+        preceden: se retrocede por ellos y se recorren hacia adelante.
+        """
+        anteriores = []
+        while True:
+            inicio = self._linea_anterior(inicio)
+            if inicio is None:
+                break
+            line = self._linea(inicio)
+            if not esperando_texto_tras(line, False, self.dialecto):
+                break
+            anteriores.append(line)
+        esperando = False
+        for line in reversed(anteriores):
+            esperando = esperando_texto_tras(line, esperando, self.dialecto)
+        return esperando
+
+    def offsets_secciones(self):
+        """Posición (en bytes) de cada cabecera "Banco de Preguntas" que abre una sección"""
+        offsets = []
+        revisada = None
+        for m in _RE_CANDIDATA.finditer(self._mm):
+            inicio = self._inicio_linea(m.start())
+            if inicio != revisada:
+                revisada = inicio
+                line = self._linea(inicio)
+                # El estado de la línea anterior solo se reconstruye para las cabeceras
+                if abre_seccion(line) and abre_seccion(line, self._esperando_texto(inicio)):
+                    offsets.append(inicio)
+        self._liberar(0, len(self._mm))
+        return offsets
+
+    def secciones(self):
+        """Rangos (inicio, fin) en bytes de las secciones, iguales a las de banco_parser.iter_secciones"""
+        limites = [0] + [offset for offset in self.offsets_secciones() if offset > 0] + [len(self._mm)]
+        return [(inicio, fin) for inicio, fin in zip(limites, limites[1:]) if fin > inicio]
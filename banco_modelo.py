@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Registros compactos del banco de preguntas: Materia, Pregunta y Respuesta
+Usan __slots__ en lugar de diccionarios. Las líneas de continuación se
+acumulan en una lista que se une una sola vez al cerrar la pregunta, en lugar
+de concatenar el texto línea a línea; to_dict() devuelve exactamente la forma
+de banco_preguntas.json. EscritorPorMaterias es la base de los escritores que
+reciben las preguntas una a una
+"""
+
+
+def _iniciar_partes(texto):
+    # Un espacio final ya separa del texto siguiente; join pone ese mismo espacio
+    if not texto:
+        return []
+    return [texto[:-1] if texto[-1] == ' ' else texto]
+
+
+class Respuesta:
+    """Opción de respuesta ({'opcion', 'texto'})"""
+
+    __slots__ = ('opcion', 'texto', '_partes')
+
+    def __init__(self, opcion, texto=''):
+        self.opcion = opcion
+        self.texto = texto
+        self._partes = None
+
+    def agregar_texto(self, texto):
+        """Agrega una línea de continuación (ya recortada), separada por un espacio"""
+        if self._partes is None:
+            self._partes = _iniciar_partes(self.texto)
+        self._partes.append(texto)
+
+    def cerrar(self):
+        """Une las líneas acumuladas en texto"""
+        if self._partes is not None:
+            self.texto = ' '.join(self._partes)
+            self._partes = None
+
+    def to_dict(self):
+        return {'opcion': self.opcion, 'texto': self.texto}
+
+    @classmethod
+    def from_dict(cls, datos):
+        return cls(datos['opcion'], datos['texto'])
+
+    def __repr__(self):
+        return f"Respuesta({self.opcion!r}, {self.texto!r})"
+
+
+class Pregunta:
+    """Pregunta con su número, su texto y sus respuestas ({'numero', 'texto', 'respuestas'})"""
+
+    __slots__ = ('numero', 'texto', 'respuestas', '_partes')
+
+    def __init__(self, numero, texto='', respuestas=None):
+        self.numero = numero
+        self.texto = texto
+        self.respuestas = respuestas if respuestas is not None else []
+        self._partes = None
+
+    def agregar_texto(self, texto):
+        """Agrega una línea de continuación (ya recortada), separada por un espacio"""
+        if self._partes is None:
+            self._partes = _iniciar_partes(self.texto)
+        self._partes.append(texto)
+
+    def terminar_con_espacio(self):
+        """Deja un espacio al final del texto, si no está vacío (el PDF lo hace antes de las opciones)"""
+        self.cerrar_texto()
+        if self.texto and self.texto[-1] != ' ':
+            self.texto += ' '
+
+    def cerrar_texto(self):
+        if self._partes is not None:
+            self.texto = ' '.join(self._partes)
+            self._partes = None
+
+    def cerrar(self):
+        """Une las líneas acumuladas de la pregunta y de sus respuestas"""
+        self.cerrar_texto()
+        for respuesta in self.respuestas:
+            respuesta.cerrar()
+
+    def to_dict(self):
+        return {
+            'numero': self.numero,
+            'texto': self.texto,
+            'respuestas': [respuesta.to_dict() for respuesta in self.respuestas]
+        }
+
+    @classmethod
+    def from_dict(cls, datos):
+        return cls(datos['numero'], datos['texto'], [Respuesta.from_dict(r) for r in datos['respuestas']])
+
+    def __repr__(self):
+        return f"Pregunta({self.numero!r}, {self.texto!r}, {self.respuestas!r})"
+
+
+class Materia:
+    """Materia con sus preguntas ({'materia', 'preguntas'})"""
+
+    __slots__ = ('materia', 'preguntas')
+
+    def __init__(self, materia, preguntas=None):
+        self.materia = materia
+        self.preguntas = preguntas if preguntas is not None else []
+
+    def to_dict(self):
+        return {
+            'materia': self.materia,
+            'preguntas': [pregunta.to_dict() for pregunta in self.preguntas]
+        }
+
+    @classmethod
+    def from_dict(cls, datos):
+        return cls(datos['materia'], [Pregunta.from_dict(p) for p in datos['preguntas']])
+
+    def __repr__(self):
+        return f"Materia({self.materia!r}, {len(self.preguntas)} preguntas)"
+
+
+class EscritorPorMaterias:
+    """Agrupa en materias las preguntas sueltas que entrega banco_parser.iter_preguntas
+
+    Una pregunta con otra clave_materia que la anterior abre una materia
+    nueva, aunque tenga el mismo nombre; escribir_materia usa una clave
+    nueva por cada materia. Las subclases implementan
+    _abrir_materia(materia_nombre) y _agregar_pregunta(materia_nombre, pregunta).
+    """
+
+    def __init__(self):
+        self._materia_actual = None
+        self._hay_materia = False
+        self._contador_materias = 0
+
+    def _nueva_clave(self):
+        self._contador_materias += 1
+        return ('materia', self._contador_materias)
+
+    def escribir_pregunta(self, clave_materia, materia_nombre, pregunta):
+        """Escribe una pregunta (Pregunta); un cambio de clave_materia abre una materia nueva"""
+        if clave_materia != self._materia_actual or not self._hay_materia:
+            self._materia_actual = clave_materia
+            self._hay_materia = True
+            self._abrir_materia(materia_nombre)
+        self._agregar_pregunta(materia_nombre, pregunta)
+
+    def escribir_materia(self, materia):
+        """Escribe una materia completa (Materia)"""
+        clave = self._nueva_clave()
+        for pregunta in materia.preguntas:
+            self.escribir_pregunta(clave, materia.materia, pregunta)
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor de clasificación de líneas compartido por txt_to_json y pdf_to_json
+Los patrones se compilan una sola vez y cada línea se despacha por su primer
+carácter, así la mayoría de las líneas se clasifican con una sola expresión
+regular en lugar de recorrer toda la cadena de re.match
+"""
+
+import re
+from collections import namedtuple
+
+from banco_modelo import Materia, Pregunta, Respuesta
+
+# Viñetas reconocidas: • (U+2022) y \uf0b7 (bullet de fuente especial)
+VINETAS = '•\uf0b7'
+
+# Tipos de línea
+VACIA = 'vacia'
+CABECERA = 'cabecera'
+PREGUNTA = 'pregunta'
+RESPUESTA = 'respuesta'
+VINETA = 'vineta'
+CONTINUACION = 'continuacion'
+
+_RE_PREFIJO = re.compile(r'^[•\s]+')
+_RE_MATERIA = re.compile(r'Banco de [Pp]reguntas\s*:?\s*(.+)', re.IGNORECASE)
+_RE_GENERADO = re.compile(r'^GENERADO\s+', re.IGNORECASE)
+# "Pregunta X:" o "Pregunta X" (en el TXT puede estar sola en una línea)
+_RE_PREGUNTA_TXT = re.compile(r'Pregunta\s+(\d+)(?:\s*:?\s*(.+))?$', re.IGNORECASE)
+_RE_PREGUNTA_PDF = re.compile(r'Pregunta\s+(\d+)[:\s]*(.+)', re.IGNORECASE)
+# "1. texto" o "1) texto"
+_RE_NUMERADA = re.compile(r'(\d+)[\.\)]\s*(.+)')
+# "A:", "B:", ... o "a)", "b)", ...
+_RE_RESPUESTA = re.compile(r'([A-Ea-e])[:\)]\s*(.+)')
+_RE_VINETA_LETRA = re.compile(r'[\uf0b7•]\s+([A-Ea-e])[:\)]\s*(.+)')
+_RE_VINETA = re.compile(r'[\uf0b7•]\s+(.+)')
+# Divide el texto de una pregunta en las viñetas incrustadas, conservándolas
+_RE_DIVIDIR_VINETAS = re.compile(r'([\uf0b7•])')
+
+
+def normalizar_materia_txt(materia_nombre):
+    """Limpia el nombre de la materia tomado de la cabecera del TXT"""
+    materia_nombre = materia_nombre.strip()
+    # Remover "GENERADO" si está al inicio
+    materia_nombre = _RE_GENERADO.sub('', materia_nombre).strip()
+    # Convertir a formato título (primera letra mayúscula de cada palabra)
+    materia_nombre = materia_nombre.title()
+    # Correcciones específicas
+    if 'Generado Inteligencia Artificial' in materia_nombre or 'Inteligencia Artificial' in materia_nombre:
+        materia_nombre = 'Inteligencia Artificial'
+    return materia_nombre
+
+
+def normalizar_materia_pdf(materia_nombre):
+    """Limpia el nombre de la materia tomado de la cabecera del PDF"""
+    materia_nombre = materia_nombre.strip()
+    # Remover "GENERADO" si está al inicio
+    materia_nombre = _RE_GENERADO.sub('', materia_nombre).strip()
+    # Convertir a formato título (primera letra mayúscula, resto minúsculas)
+    if materia_nombre.isupper() and len(materia_nombre) > 1:
+        materia_nombre = materia_nombre.capitalize()
+    return materia_nombre
+
+
+# Diferencias entre los dos conversores:
+#   patron_pregunta: expresión para "Pregunta X"
+#   normalizar_materia: limpieza del nombre de la materia
+#   vineta_con_letra: reconocer "\uf0b7 A: texto" como opción con letra explícita
+#   espacio_tras_pregunta: el PDF deja un espacio al final del texto de la
+#       pregunta cuando aparece la primera opción con letra
+#   respuestas_incrustadas: buscar opciones con viñeta dentro del texto de las
+#       preguntas que quedaron sin respuestas
+Dialecto = namedtuple('Dialecto', [
+    'patron_pregunta',
+    'normalizar_materia',
+    'vineta_con_letra',
+    'espacio_tras_pregunta',
+    'respuestas_incrustadas',
+])
+
+DIALECTO_TXT = Dialecto(
+    patron_pregunta=_RE_PREGUNTA_TXT,
+    normalizar_materia=normalizar_materia_txt,
+    vineta_con_letra=True,
+    espacio_tras_pregunta=False,
+    respuestas_incrustadas=False,
+)
+
+DIALECTO_PDF = Dialecto(
+    patron_pregunta=_RE_PREGUNTA_PDF,
+    normalizar_materia=normalizar_materia_pdf,
+    vineta_con_letra=False,
+    espacio_tras_pregunta=True,
+    respuestas_incrustadas=True,
+)
+
+
+def limpiar_linea(line):
+    """Quita espacios y viñetas • del inicio de una línea ya recortada"""
+    if line[:1] == '•':
+        return _RE_PREFIJO.sub('', line)
+    return line
+
+
+def _clasificar(line, line_clean, dialecto):
+    """Clasifica una línea no vacía; devuelve (tipo, valor1, valor2)"""
+    c = line_clean[0]
+
+    # Despacho por el primer carácter: cada patrón solo se prueba si puede coincidir
+    if c == 'B' or c == 'b':
+        m = _RE_MATERIA.match(line_clean)
+        if m:
+            return CABECERA, m.group(1), None
+    elif c == 'P' or c == 'p':
+        m = dialecto.patron_pregunta.match(line_clean)
+        if m:
+            return PREGUNTA, m.group(1), (m.group(2) or '').strip()
+    elif c.isdecimal():
+        m = _RE_NUMERADA.match(line_clean)
+        if m:
+            return PREGUNTA, m.group(1), m.group(2).strip()
+
+    if c in 'ABCDEabcde':
+        m = _RE_RESPUESTA.match(line_clean)
+        if m:
+            return RESPUESTA, m.group(1).upper(), m.group(2).strip()
+
+    # Las viñetas se buscan en la línea original (antes de limpiar el •)
+    if line[0] in VINETAS:
+        if dialecto.vineta_con_letra:
+            m = _RE_VINETA_LETRA.match(line)
+            if m:
+                return RESPUESTA, m.group(1).upper(), m.group(2).strip()
+        m = _RE_VINETA.match(line)
+        if m:
+            return VINETA, None, m.group(1).strip()
+
+    return CONTINUACION, None, None
+
+
+def clasificar_linea(line, dialecto=DIALECTO_TXT):
+    """Clasifica una línea suelta; devuelve (tipo, valor1, valor2)"""
+    line = line.strip()
+    line_clean = limpiar_linea(line)
+    if not line_clean:
+        return VACIA, None, None
+    return _clasificar(line, line_clean, dialecto)
+
+
+def separar_respuestas_incrustadas(texto_pregunta):
+    """Separa las respuestas con viñeta incrustadas en el texto de la pregunta
+
+    Devuelve (texto sin las respuestas, [banco_modelo.Respuesta]), o el texto
+    tal cual y [] si no hay ninguna. Una viñeta seguida de un espacio y de
+    algo más abre una respuesta que llega hasta la siguiente viñeta; las de
+    dos caracteres o menos se descartan y se toman hasta cinco (A-E). El
+    texto se recorre una sola vez: sin viñetas, la división no encuentra nada
+    y la pregunta queda como estaba.
+    """
+    partes = _RE_DIVIDIR_VINETAS.split(texto_pregunta)
+    if len(partes) == 1:
+        return texto_pregunta, []
+
+    respuestas = []
+    resto = [partes[0]]
+    for i in range(1, len(partes), 2):
+        segmento = partes[i + 1]
+        if len(segmento) > 1 and segmento[0].isspace():
+            respuesta_texto = segmento.strip()
+            if len(respuesta_texto) > 2 and len(respuestas) < 5:  # Filtrar respuestas muy cortas
+                respuestas.append(Respuesta(chr(ord('A') + len(respuestas)), respuesta_texto))
+        else:
+            # Viñeta sin espacio o al final: queda en el texto de la pregunta
+            resto += [partes[i], segmento]
+
+    if not respuestas:
+        return texto_pregunta, []
+    return ''.join(resto).strip(), respuestas
+
+
+def extract_respuestas_from_text(texto_pregunta):
+    """Extrae respuestas que están incrustadas en el texto de la pregunta
+
+    Como separar_respuestas_incrustadas, con las respuestas como diccionarios.
+    """
+    texto, respuestas = separar_respuestas_incrustadas(texto_pregunta)
+    return texto, [respuesta.to_dict() for respuesta in respuestas]
+
+
+def _es_texto_de_pregunta(line, line_clean):
+    """La línea que sigue a "Pregunta X" es su texto si no es una respuesta (A-E:) ni empieza con viñeta"""
+    return (line_clean and line[0] not in VINETAS
+            and not (line_clean[0] in 'ABCDE' and line_clean[1:2] == ':'))
+
+
+def cerrar_pregunta(pregunta, dialecto):
+    """Último ajuste de una pregunta antes de entregarla"""
+    pregunta.cerrar()
+    if dialecto.respuestas_incrustadas and not pregunta.respuestas:
+        # Intentar extraer respuestas del texto
+        texto_limpio, respuestas_extraidas = separar_respuestas_incrustadas(pregunta.texto)
+        if respuestas_extraidas:
+            pregunta.texto = texto_limpio
+            pregunta.respuestas = respuestas_extraidas
+    return pregunta
+
+
+def iter_preguntas(lines, dialecto=DIALECTO_TXT, conteo=None):
+    """Recorre las líneas una a una y entrega cada pregunta apenas se cierra
+
+    Genera tuplas (indice_materia, nombre_materia, pregunta), con la pregunta
+    como banco_modelo.Pregunta. No necesita el
+    texto completo en memoria: acepta cualquier iterable de líneas, incluido
+    un archivo abierto. Si se pasa conteo (un Counter), se cuentan las líneas
+    por tipo; la línea de texto que sigue a "Pregunta X" cuenta como
+    continuación.
+    """
+    indice_materia = -1
+    materia_nombre = None
+    current_pregunta = None
+    current_respuestas = []
+    # "Pregunta X" sin texto: la siguiente línea puede ser el texto
+    esperando_texto = False
+
+    for line in lines:
+        line = line.strip()
+        line_clean = limpiar_linea(line)
+
+        if esperando_texto:
+            esperando_texto = False
+            if _es_texto_de_pregunta(line, line_clean):
+                current_pregunta.texto = line_clean
+                if conteo is not None:
+                    conteo[CONTINUACION] += 1
+                continue
+
+        if not line_clean:
+            if conteo is not None:
+                conteo[VACIA] += 1
+            continue
+
+        tipo, valor1, valor2 = _clasificar(line, line_clean, dialecto)
+        if conteo is not None:
+            conteo[tipo] += 1
+
+        if tipo is CABECERA:
+            # Cerrar la pregunta pendiente de la materia anterior
+            if current_pregunta is not None and materia_nombre is not None:
+                yield indice_materia, materia_nombre, cerrar_pregunta(current_pregunta, dialecto)
+
+            # Nueva materia
+            indice_materia += 1
+            materia_nombre = dialecto.normalizar_materia(valor1)
+            current_pregunta = None
+            current_respuestas = []
+            continue
+
+        if tipo is PREGUNTA:
+            # Cerrar pregunta anterior
+            if current_pregunta is not None and materia_nombre is not None:
+                yield indice_materia, materia_nombre, cerrar_pregunta(current_pregunta, dialecto)
+
+            current_pregunta = Pregunta(valor1, valor2)
+            current_respuestas = current_pregunta.respuestas
+            esperando_texto = not valor2
+            continue
+
+        if tipo is RESPUESTA:
+            if current_pregunta is not None:
+                if dialecto.espacio_tras_pregunta:
+                    current_pregunta.terminar_con_espacio()
+                current_respuestas.append(Respuesta(valor1, valor2))
+            continue
+
+        if tipo is VINETA:
+            # Viñeta sin letra explícita - asignar letra automáticamente
+            if current_pregunta is not None:
+                if current_respuestas:
+                    siguiente_letra = chr(ord(current_respuestas[-1].opcion) + 1)
+                else:
+                    siguiente_letra = 'A'
+
+                if siguiente_letra <= 'E':
+                    current_respuestas.append(Respuesta(siguiente_letra, valor2))
+            continue
+
+        # Texto continuo: parte de pregunta o respuesta
+        if current_pregunta is not None:
+            if current_respuestas:
+                # Agregar a la última respuesta (solo si no empieza con •)
+                if line[0] != '•':
+                    current_respuestas[-1].agregar_texto(line_clean)
+            elif line[0] not in VINETAS:
+                # Agregar a la pregunta (una línea con viñeta al inicio sería una respuesta)
+                current_pregunta.agregar_texto(line_clean)
+
+    # Cerrar la última pregunta
+    if current_pregunta is not None and materia_nombre is not None:
+        yield indice_materia, materia_nombre, cerrar_pregunta(current_pregunta, dialecto)
+
+
+def iter_materias(lines, dialecto=DIALECTO_TXT, conteo=None):
+    """Agrupa las preguntas por materia y entrega cada materia apenas se cierra
+
+    Entrega banco_modelo.Materia; las materias sin preguntas se descartan,
+    igual que en la conversión completa.
+    """
+    current_materia = None
+    current_indice = None
+    for indice_materia, materia_nombre, pregunta in iter_preguntas(lines, dialecto, conteo):
+        if indice_materia != current_indice:
+            if current_materia is not None:
+                yield current_materia
+            current_indice = indice_materia
+            current_materia = Materia(materia_nombre)
+        current_materia.preguntas.append(pregunta)
+
+    if current_materia is not None:
+        yield current_materia
+
+
+def iter_secciones(lines, dialecto=DIALECTO_TXT):
+    """Divide las líneas en secciones que empiezan en una cabecera "Banco de Preguntas"
+
+    Entrega listas con las líneas originales de cada sección. El parser no
+    arrastra estado de una sección a la siguiente, así que convertir cada
+    sección por separado y concatenar las materias da exactamente el mismo
+    resultado que convertir el texto completo. Solo se prueban los patrones
+    de cabecera y de pregunta: una cabecera que sigue a "Pregunta X" sin texto
+    se toma como texto de esa pregunta y no abre una sección nueva.
+    """
+    seccion = []
+    esperando_texto = False
+
+    for raw in lines:
+        line = raw.strip()
+        line_clean = limpiar_linea(line)
+
+        if esperando_texto:
+            esperando_texto = False
+            if _es_texto_de_pregunta(line, line_clean):
+                seccion.append(raw)
+                continue
+
+        if line_clean:
+            c = line_clean[0]
+            if c == 'B' or c == 'b':
+                if _RE_MATERIA.match(line_clean):
+                    if seccion:
+                        yield seccion
+                    seccion = []
+            elif c == 'P' or c == 'p' or c.isdecimal():
+                tipo, _, texto = _clasificar(line, line_clean, dialecto)
+                esperando_texto = tipo is PREGUNTA and not texto
+
+        seccion.append(raw)
+
+    if seccion:
+        yield seccion
+
+
+def abre_seccion(line, esperando_texto=False):
+    """Si una línea (ya recortada) abre una sección nueva en iter_secciones"""
+    line_clean = limpiar_linea(line)
+    if not line_clean or line_clean[0] not in 'Bb' or not _RE_MATERIA.match(line_clean):
+        return False
+    return not (esperando_texto and _es_texto_de_pregunta(line, line_clean))
+
+
+def esperando_texto_tras(line, esperando_texto, dialecto=DIALECTO_TXT):
+    """Estado esperando_texto de iter_secciones después de una línea (ya recortada)
+
+    Es True solo tras un "Pregunta X" sin texto que no se tomó a su vez como
+    texto de la pregunta anterior.
+    """
+    line_clean = limpiar_linea(line)
+    if esperando_texto and _es_texto_de_pregunta(line, line_clean):
+        return False
+    if not line_clean or not (line_clean[0] in 'Pp' or line_clean[0].isdecimal()):
+        return False
+    tipo, _, texto = _clasificar(line, line_clean, dialecto)
+    return tipo is PREGUNTA and not texto
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Backends de extracción de texto de PDF para pdf_to_json
+Cada backend importa su librería solo cuando se usa, así este módulo (y
+pdf_to_json) se pueden importar aunque no haya ninguna instalada. Por defecto
+se usa la librería más rápida disponible: PyMuPDF, luego pdfplumber y PyPDF2
+"""
+
+import hashlib
+import importlib
+import importlib.util
+import re
+import time
+
+from banco_cache import hash_bytes
+
+# Orden de preferencia de la selección automática, de la más rápida a la más lenta
+PREFERENCIA = ['PyMuPDF', 'pdfplumber', 'PyPDF2']
+
+_BACKENDS = {}
+
+
+def registrar_backend(clase):
+    """Registra una clase de backend (decorador); los nuevos van al final de PREFERENCIA"""
+    _BACKENDS[clase.nombre] = clase
+    if clase.nombre not in PREFERENCIA:
+        PREFERENCIA.append(clase.nombre)
+    return clase
+
+
+class BackendPDF:
+    """Interfaz de un backend: contar páginas, extraer su texto y hashear su contenido
+
+    nombre identifica al backend (también en la caché de páginas) y modulo es
+    la librería que necesita, que se importa recién en el primer uso.
+    """
+
+    nombre = None
+    modulo = None
+    paquete = None  # nombre para pip install, si difiere de modulo
+
+    @classmethod
+    def disponible(cls):
+        """La librería está instalada (sin importarla)"""
+        return importlib.util.find_spec(cls.modulo) is not None
+
+    @property
+    def lib(self):
+        return importlib.import_module(self.modulo)
+
+    def contar_paginas(self, pdf_path):
+        raise NotImplementedError
+
+    def iter_paginas(self, pdf_path, page_numbers):
+        """Entrega el texto de las páginas indicadas, en el mismo orden, con el documento abierto"""
+        raise NotImplementedError
+
+    def extraer_paginas(self, pdf_path, page_numbers):
+        """Texto de las páginas indicadas, en el mismo orden"""
+        return list(self.iter_paginas(pdf_path, page_numbers))
+
+    def hashes_paginas(self, pdf_path):
+        """Hash de cada página (contenido y recursos), sin extraer su texto"""
+        raise NotImplementedError
+
+
+def hash_pagina(contenido, recursos):
+    """Hash de una página a partir de su contenido y de la huella de sus recursos
+
+    Dos páginas con el mismo contenido pueden dar otro texto si cambian sus
+    fuentes o sus XObjects (p. ej. una página que solo dibuja "/Fm0 Do"), así
+    que la caché de páginas las distingue también por sus recursos.
+    """
+    return hash_bytes(contenido + b'\0' + recursos)
+
+
+class HuellaRecursos:
+    """Huella de objetos PDF con todo lo que referencian (fuentes, XObjects...)
+
+    Cada referencia indirecta se reemplaza por el hash del objeto al que
+    apunta, así la huella no depende de los números de objeto y sirve para
+    comparar páginas de PDFs distintos. Cada objeto se hashea una sola vez
+    por documento. Las subclases saben serializar los objetos de su librería.
+    """
+
+    # /Parent llevaría al árbol de páginas entero
+    CLAVES_OMITIDAS = frozenset({'Parent', '/Parent'})
+
+    def __init__(self):
+        self._memo = {}
+        self._en_curso = set()
+
+    def referencia(self, clave, resolver):
+        """Hash del objeto indirecto `clave`; resolver() lo devuelve la primera vez"""
+        huella = self._memo.get(clave)
+        if huella is None:
+            if clave in self._en_curso:
+                return b'ciclo'
+            self._en_curso.add(clave)
+            try:
+                huella = hashlib.sha256(self.serializar(resolver())).digest()
+            finally:
+                self._en_curso.discard(clave)
+            self._memo[clave] = huella
+        return huella
+
+    def serializar_dict(self, items):
+        partes = [b'<<']
+        for clave, valor in sorted(items, key=lambda item: str(item[0])):
+            if str(clave) not in self.CLAVES_OMITIDAS:
+                partes += [str(clave).encode('utf-8'), b' ', self.serializar(valor), b' ']
+        partes.append(b'>>')
+        return b''.join(partes)
+
+    def serializar_lista(self, elementos):
+        return b'[' + b' '.join(self.serializar(elemento) for elemento in elementos) + b']'
+
+    def serializar(self, objeto):
+        raise NotImplementedError
+
+
+@registrar_backend
+class BackendPyMuPDF(BackendPDF):
+    nombre = 'PyMuPDF'
+    modulo = 'fitz'
+    paquete = 'PyMuPDF'
+
+    def contar_paginas(self, pdf_path):
+        with self.lib.open(pdf_path) as doc:
+            return doc.page_count
+
+    def iter_paginas(self, pdf_path, page_numbers):
+        with self.lib.open(pdf_path) as doc:
+            for page_num in page_numbers:
+                yield doc[page_num].get_text() or ''
+
+    def hashes_paginas(self, pdf_path):
+        with self.lib.open(pdf_path) as doc:
+            huella = _HuellaPyMuPDF(doc)
+            return [hash_pagina(page.read_contents(), huella.recursos_pagina(page.xref)) for page in doc]
+
+
+@registrar_backend
+class BackendPdfplumber(BackendPDF):
+    nombre = 'pdfplumber'
+    modulo = 'pdfplumber'
+
+    def contar_paginas(self, pdf_path):
+        with self.lib.open(pdf_path) as pdf:
+            return len(pdf.pages)
+
+    def iter_paginas(self, pdf_path, page_numbers):
+        with self.lib.open(pdf_path) as pdf:
+            for page_num in page_numbers:
+                yield pdf.pages[page_num].extract_text() or ''
+
+    def hashes_paginas(self, pdf_path):
+        from pdfminer.pdftypes import resolve1
+        hashes = []
+        huella = _HuellaPdfminer()
+        with self.lib.open(pdf_path) as pdf:
+            for page in pdf.pages:
+                data = b''.join(resolve1(stream).get_data() for stream in page.page_obj.contents)
+                hashes.append(hash_pagina(data, huella.serializar(page.page_obj.resources)))
+        return hashes
+
+
+@registrar_backend
+class BackendPyPDF2(BackendPDF):
+    nombre = 'PyPDF2'
+    modulo = 'PyPDF2'
+
+    def contar_paginas(self, pdf_path):
+        with open(pdf_path, 'rb') as file:
+            return len(self.lib.PdfReader(file).pages)
+
+    def iter_paginas(self, pdf_path, page_numbers):
+        with open(pdf_path, 'rb') as file:
+            pdf_reader = self.lib.PdfReader(file)
+            for page_num in page_numbers:
+                yield pdf_reader.pages[page_num].extract_text() or ''
+
+    def hashes_paginas(self, pdf_path):
+        hashes = []
+        huella = _HuellaPyPDF2()
+        with open(pdf_path, 'rb') as file:
+            for page in self.lib.PdfReader(file).pages:
+                contents = page.get_contents()
+                hashes.append(hash_pagina(contents.get_data() if contents else b'',
+                                          huella.serializar(page.get('/Resources'))))
+        return hashes
+
+
+_RE_REFERENCIA = re.compile(r'\b(\d+) (\d+) R\b')
+_RE_PARENT = re.compile(r'/Parent\s+\d+ \d+ R')
+
+
+class _HuellaPyMuPDF(HuellaRecursos):
+    """Huella de recursos con PyMuPDF, que entrega cada objeto como texto PDF"""
+
+    def __init__(self, doc):
+        super().__init__()
+        self.doc = doc
+
+    def _referencia(self, xref):
+        return self.referencia(xref, lambda: xref)
+
+    def _sin_referencias(self, texto):
+        return _RE_REFERENCIA.sub(lambda m: self._referencia(int(m.group(1))).hex(), texto)
+
+    def serializar(self, xref):
+        texto = self.doc.xref_object(xref, compressed=True)
+        # /Parent X 0 R no se sigue (ver CLAVES_OMITIDAS)
+        texto = _RE_PARENT.sub('', texto)
+        datos = self._sin_referencias(texto).encode('utf-8')
+        if self.doc.xref_is_stream(xref):
+            datos += b'stream' + self.doc.xref_stream_raw(xref)
+        return datos
+
+    def recursos_pagina(self, xref):
+        """Huella de /Resources de una página, heredado del árbol de páginas si hace falta"""
+        while xref:
+            tipo, valor = self.doc.xref_get_key(xref, 'Resources')
+            if tipo == 'xref':
+                return self._referencia(int(valor.split()[0]))
+            if tipo == 'dict':
+                return self._sin_referencias(valor).encode('utf-8')
+            tipo, valor = self.doc.xref_get_key(xref, 'Parent')
+            xref = int(valor.split()[0]) if tipo == 'xref' else 0
+        return b''
+
+
+class _HuellaPdfminer(HuellaRecursos):
+    """Huella de recursos con pdfminer (pdfplumber)"""
+
+    def serializar(self, objeto):
+        from pdfminer.pdftypes import PDFObjRef, PDFStream
+        from pdfminer.psparser import PSLiteral
+        if isinstance(objeto, PDFObjRef):
+            return b'R' + self.referencia(objeto.objid, objeto.resolve)
+        if isinstance(objeto, PDFStream):
+            # Los datos sin decodificar, si todavía están (no hace falta descomprimir imágenes)
+            datos = objeto.rawdata if objeto.rawdata is not None else objeto.get_data()
+            return self.serializar_dict(objeto.attrs.items()) + b'stream' + datos
+        if isinstance(objeto, dict):
+            return self.serializar_dict(objeto.items())
+        if isinstance(objeto, (list, tuple)):
+            return self.serializar_lista(objeto)
+        if isinstance(objeto, PSLiteral):
+            return b'/' + str(objeto.name).encode('utf-8')
+        return repr(objeto).encode('utf-8')
+
+
+class _HuellaPyPDF2(HuellaRecursos):
+    """Huella de recursos con PyPDF2"""
+
+    def __init__(self):
+        super().__init__()
+        self.generic = importlib.import_module('PyPDF2.generic')
+
+    def serializar(self, objeto):
+        generic = self.generic
+        if isinstance(objeto, generic.IndirectObject):
+            return b'R' + self.referencia((objeto.idnum, objeto.generation), objeto.get_object)
+        if isinstance(objeto, generic.StreamObject):
+            # Los datos sin decodificar (no hace falta descomprimir imágenes)
+            datos = getattr(objeto, '_data', None)
+            if datos is None:
+                datos = objeto.get_data()
+            return self.serializar_dict(objeto.items()) + b'stream' + datos
+        if isinstance(objeto, dict):
+            return self.serializar_dict(objeto.items())
+        if isinstance(objeto, list):
+            return self.serializar_lista(objeto)
+        return repr(objeto).encode('utf-8')
+
+
+def backends_disponibles():
+    """Nombres de los backends instalados, en orden de preferencia"""
+    return [nombre for nombre in PREFERENCIA if nombre in _BACKENDS and _BACKENDS[nombre].disponible()]
+
+
+def mensaje_sin_backend():
+    """Mensaje para cuando no hay ninguna librería de PDF instalada"""
+    lineas = ["No se encontró ninguna librería de PDF instalada.",
+              "Por favor instala una de las siguientes:"]
+    lineas += [f"  pip install {_BACKENDS[nombre].paquete or _BACKENDS[nombre].modulo}"
+               for nombre in PREFERENCIA if nombre in _BACKENDS]
+    return '\n'.join(lineas)
+
+
+def obtener_backend(nombre=None):
+    """Backend pedido por nombre o, sin nombre, el más rápido disponible
+
+    Lanza ImportError si el backend pedido (o cualquiera, sin nombre) no
+    está instalado, y ValueError si el nombre no está registrado.
+    """
+    if nombre is None or nombre == 'auto':
+        disponibles = backends_disponibles()
+        if not disponibles:
+            raise ImportError(mensaje_sin_backend())
+        nombre = disponibles[0]
+    if nombre not in _BACKENDS:
+        raise ValueError(f"Backend de PDF desconocido: {nombre} (disponibles: {', '.join(_BACKENDS)})")
+    clase = _BACKENDS[nombre]
+    if not clase.disponible():
+        raise ImportError(f"El backend {nombre} necesita la librería {clase.modulo}: "
+                          f"pip install {clase.paquete or clase.modulo}")
+    return clase()
+
+
+def comparar_backends(pdf_path, nombres=None, repeticiones=3, max_paginas=None):
+    """Mide la extracción de texto de cada backend disponible sobre un PDF
+
+    Devuelve, por backend, el mejor tiempo de `repeticiones` extracciones
+    completas (o de las primeras max_paginas páginas), páginas por segundo y
+    caracteres extraídos, ordenado del más rápido al más lento.
+    """
+    resultados = []
+    for nombre in nombres or backends_disponibles():
+        backend = obtener_backend(nombre)
+        num_paginas = backend.contar_paginas(pdf_path)
+        if max_paginas is not None:
+            num_paginas = min(num_paginas, max_paginas)
+        mejor = None
+        for _ in range(max(1, repeticiones)):
+            inicio = time.perf_counter()
+            pages = backend.extraer_paginas(pdf_path, range(num_paginas))
+            segundos = time.perf_counter() - inicio
+            mejor = segundos if mejor is None else min(mejor, segundos)
+        resultados.append({
+            'backend': nombre,
+            'paginas': num_paginas,
+            'segundos': round(mejor, 4),
+            'paginas_por_segundo': round(num_paginas / mejor, 1) if mejor else None,
+            'caracteres': sum(len(page) for page in pages),
+        })
+    resultados.sort(key=lambda r: r['segundos'])
+    return resultados
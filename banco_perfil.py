@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Medición por etapas de las conversiones del banco de preguntas (--profile)
+Registra el tiempo y la memoria pico (tracemalloc, por encima de la memoria
+que ya estaba en uso al empezar la etapa) de cada etapa: extracción,
+lectura, clasificación de líneas, extracción de respuestas incrustadas y
+escritura, cuenta las líneas por tipo y guarda todo en un reporte JSON junto
+a la salida
+"""
+
+import json
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+import banco_parser
+from banco_parser import CABECERA, CONTINUACION, PREGUNTA, RESPUESTA, VACIA, VINETA
+
+# Orden de los tipos de línea en el reporte
+_TIPOS_LINEA = (CABECERA, PREGUNTA, RESPUESTA, VINETA, CONTINUACION, VACIA)
+
+
+def perfil_path(output_path):
+    """Ruta del reporte de --profile de una salida"""
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.stem + '.perfil.json')
+
+
+class _Etapa:
+    __slots__ = ('segundos', 'llamadas', 'pico_memoria')
+
+    def __init__(self):
+        self.segundos = 0.0
+        self.llamadas = 0
+        self.pico_memoria = 0
+
+
+class Perfil:
+    """Acumula tiempo y memoria pico por etapa
+
+    Las etapas se pueden anidar y repetir (por ejemplo una por pregunta): el
+    tiempo de cada etapa es exclusivo, sin contar el de las etapas abiertas
+    dentro de ella, y la memoria pico es el máximo de memoria trazada mientras
+    la etapa estuvo abierta menos la que ya estaba en uso al abrirla (lo que la
+    etapa agregó, sin lo que dejaron las anteriores). Con memoria=True se activa tracemalloc, que hace
+    más lenta la conversión; los tiempos sirven para comparar etapas entre sí.
+
+    Uso:
+        with Perfil() as perfil:
+            with perfil.etapa('extraccion'):
+                ...
+        perfil.guardar(perfil_path(output_path), archivo=...)
+    """
+
+    def __init__(self, memoria=True):
+        self.memoria = memoria
+        self.etapas = {}
+        self.conteo_lineas = Counter()
+        self._pila = []  # [etapa, inicio, segundos de etapas hijas, memoria al entrar, pico]
+        self._inicio = None
+        self._total = None
+        self._inicio_tracemalloc = False
+
+    def __enter__(self):
+        if self.memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._inicio_tracemalloc = True
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._total = time.perf_counter() - self._inicio
+        if self._inicio_tracemalloc:
+            tracemalloc.stop()
+            self._inicio_tracemalloc = False
+
+    def _pico(self):
+        """Memoria actual y pico desde la última marca; vuelve a marcar"""
+        if not tracemalloc.is_tracing():
+            return 0, 0
+        actual, pico = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        return actual, pico
+
+    def _entrar(self, nombre):
+        etapa = self.etapas.get(nombre)
+        if etapa is None:
+            etapa = self.etapas[nombre] = _Etapa()
+        actual, pico = self._pico()
+        if self._pila:
+            padre = self._pila[-1]
+            padre[4] = max(padre[4], pico)
+        self._pila.append([etapa, time.perf_counter(), 0.0, actual, actual])
+
+    def _salir(self):
+        etapa, inicio, hijas, base, pico = self._pila.pop()
+        segundos = time.perf_counter() - inicio
+        etapa.segundos += segundos - hijas
+        etapa.llamadas += 1
+        pico = max(pico, self._pico()[1])
+        etapa.pico_memoria = max(etapa.pico_memoria, pico - base)
+        if self._pila:
+            padre = self._pila[-1]
+            padre[2] += segundos
+            padre[4] = max(padre[4], pico)
+
+    @contextmanager
+    def etapa(self, nombre):
+        """Mide el bloque como parte de la etapa `nombre`"""
+        self._entrar(nombre)
+        try:
+            yield
+        finally:
+            self._salir()
+
+    def iterar(self, nombre, iterable):
+        """Entrega los elementos de iterable midiendo cada next() como etapa `nombre`"""
+        iterador = iter(iterable)
+        while True:
+            self._entrar(nombre)
+            try:
+                elemento = next(iterador)
+            except StopIteration:
+                return
+            finally:
+                self._salir()
+            yield elemento
+
+    def iter_preguntas(self, lines, dialecto):
+        """banco_parser.iter_preguntas con lectura, clasificación y respuestas incrustadas por separado"""
+        # La búsqueda de respuestas incrustadas se saca del parser para medirla aparte
+        sin_post = dialecto._replace(respuestas_incrustadas=False)
+        lineas = self.iterar('lectura', lines)
+        preguntas = banco_parser.iter_preguntas(lineas, sin_post, self.conteo_lineas)
+        for indice_materia, materia_nombre, pregunta in self.iterar('clasificacion', preguntas):
+            if dialecto.respuestas_incrustadas:
+                with self.etapa('respuestas_incrustadas'):
+                    banco_parser.cerrar_pregunta(pregunta, dialecto)
+            yield indice_materia, materia_nombre, pregunta
+
+    def medir_salida(self, salida):
+        """Envuelve cada escritor de una SalidaMultiple para medirlo como etapa propia"""
+        salida.escritores = [
+            _EscritorMedido(self, _nombre_escritor(escritor), escritor)
+            for escritor in salida.escritores
+        ]
+        if getattr(salida, 'duplicados', None) is not None:
+            salida.duplicados = _DetectorMedido(self, 'duplicados', salida.duplicados)
+        return salida
+
+    def reporte(self, **datos):
+        """Reporte como diccionario; datos se agregan al principio"""
+        total = self._total if self._total is not None else time.perf_counter() - self._inicio
+        lineas = {tipo: self.conteo_lineas.get(tipo, 0) for tipo in _TIPOS_LINEA}
+        reporte = dict(datos)
+        reporte.update({
+            'total_segundos': round(total, 6),
+            'tracemalloc': self.memoria,
+            'etapas': {
+                nombre: {
+                    'segundos': round(etapa.segundos, 6),
+                    'porcentaje': round(etapa.segundos / total * 100, 2) if total else 0.0,
+                    'llamadas': etapa.llamadas,
+                    'pico_memoria_bytes': etapa.pico_memoria,
+                }
+                for nombre, etapa in self.etapas.items()
+            },
+            'lineas': dict(lineas, total=sum(lineas.values())),
+        })
+        return reporte
+
+    def guardar(self, path, **datos):
+        """Escribe el reporte en JSON y lo devuelve"""
+        reporte = self.reporte(**datos)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, ensure_ascii=False, indent=2)
+        return reporte
+
+
+def _nombre_escritor(escritor):
+    formato = getattr(escritor, 'formato', None)
+    return f"escritura_{formato}" if formato else 'escritura_sqlite'
+
+
+class _EscritorMedido:
+    """Escritor que mide sus llamadas como una etapa del perfil"""
+
+    def __init__(self, perfil, nombre, escritor):
+        self._perfil = perfil
+        self._nombre = nombre
+        self._escritor = escritor
+
+    def __getattr__(self, nombre):
+        return getattr(self._escritor, nombre)
+
+    def __exit__(self, *exc):
+        with self._perfil.etapa(self._nombre):
+            return self._escritor.__exit__(*exc)
+
+    def escribir_pregunta(self, clave_materia, materia_nombre, pregunta):
+        with self._perfil.etapa(self._nombre):
+            self._escritor.escribir_pregunta(clave_materia, materia_nombre, pregunta)
+
+    def escribir_materia(self, materia):
+        with self._perfil.etapa(self._nombre):
+            self._escritor.escribir_materia(materia)
+
+    def close(self):
+        with self._perfil.etapa(self._nombre):
+            self._escritor.close()
+
+
+class _DetectorMedido(_EscritorMedido):
+    """Detector de duplicados (banco_duplicados) medido como una etapa del perfil"""
+
+    def revisar(self, materia_nombre, pregunta):
+        with self._perfil.etapa(self._nombre):
+            return self._escritor.revisar(materia_nombre, pregunta)
+
+    def revisar_materia(self, materia):
+        with self._perfil.etapa(self._nombre):
+            return self._escritor.revisar_materia(materia)
+
+
+def imprimir_reporte(reporte):
+    """Tabla breve del reporte para la consola"""
+    print(f"{'etapa':<24} {'seg':>9} {'%':>7} {'pico MB':>9}")
+    for nombre, etapa in reporte['etapas'].items():
+        print(f"{nombre:<24} {etapa['segundos']:>9.3f} {etapa['porcentaje']:>7.1f} "
+              f"{etapa['pico_memoria_bytes'] / (1024 * 1024):>9.1f}")
+    print(f"{'total':<24} {reporte['total_segundos']:>9.3f}")
+    print("Líneas: " + ', '.join(f"{tipo}={total}" for tipo, total in reporte['lineas'].items()))
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exportación directa del banco de preguntas a SQLite
+Escribe las tablas materias, preguntas y respuestas que usa server.js sin
+pasar por banco_preguntas.json ni por scripts/importData.js, y el índice de
+búsqueda de texto completo (FTS5) que usa /api/buscar
+"""
+
+import sqlite3
+from pathlib import Path
+
+DEFAULT_DB_PATH = Path('database') / 'banco_preguntas.db'
+
+# Mismas tablas que scripts/importData.js; las restricciones UNIQUE se crean
+# como índices al terminar la carga
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS materias (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS preguntas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    materia_id INTEGER NOT NULL,
+    numero TEXT NOT NULL,
+    texto TEXT NOT NULL,
+    FOREIGN KEY (materia_id) REFERENCES materias(id)
+);
+CREATE TABLE IF NOT EXISTS respuestas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pregunta_id INTEGER NOT NULL,
+    opcion TEXT NOT NULL,
+    texto TEXT NOT NULL,
+    es_correcta INTEGER DEFAULT 0,
+    FOREIGN KEY (pregunta_id) REFERENCES preguntas(id)
+);
+"""
+
+_INDICES = """
+CREATE UNIQUE INDEX IF NOT EXISTS idx_materias_nombre ON materias (nombre);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_preguntas_materia_numero ON preguntas (materia_id, numero);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_respuestas_pregunta_opcion ON respuestas (pregunta_id, opcion);
+"""
+
+# Índice de búsqueda: una fila por pregunta (rowid = id de la pregunta) con su
+# texto, el de sus respuestas y el nombre de su materia. unicode61 con
+# remove_diacritics 2 ignora mayúsculas y tildes ("informacion" encuentra
+# "Información")
+TABLA_BUSQUEDA = 'preguntas_fts'
+
+_BUSQUEDA = f"""
+CREATE VIRTUAL TABLE {TABLA_BUSQUEDA} USING fts5(
+    texto, respuestas, materia,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+# Con los triggers el índice sigue al día cuando server.js, importData.js o
+# banco_delta.py modifican las tablas. Durante la carga no existen: las filas
+# del índice se insertan por lotes junto con las preguntas
+_TRIGGERS = {
+    'preguntas_fts_ai': f"""
+        CREATE TRIGGER preguntas_fts_ai AFTER INSERT ON preguntas BEGIN
+            INSERT INTO {TABLA_BUSQUEDA} (rowid, texto, respuestas, materia)
+            VALUES (new.id, new.texto, '', (SELECT nombre FROM materias WHERE id = new.materia_id));
+        END""",
+    'preguntas_fts_au': f"""
+        CREATE TRIGGER preguntas_fts_au AFTER UPDATE OF texto, materia_id ON preguntas BEGIN
+            UPDATE {TABLA_BUSQUEDA}
+            SET texto = new.texto, materia = (SELECT nombre FROM materias WHERE id = new.materia_id)
+            WHERE rowid = new.id;
+        END""",
+    'preguntas_fts_ad': f"""
+        CREATE TRIGGER preguntas_fts_ad AFTER DELETE ON preguntas BEGIN
+            DELETE FROM {TABLA_BUSQUEDA} WHERE rowid = old.id;
+        END""",
+    'respuestas_fts_ai': f"""
+        CREATE TRIGGER respuestas_fts_ai AFTER INSERT ON respuestas BEGIN
+            UPDATE {TABLA_BUSQUEDA}
+            SET respuestas = (SELECT group_concat(texto, ' ') FROM respuestas WHERE pregunta_id = new.pregunta_id)
+            WHERE rowid = new.pregunta_id;
+        END""",
+    'respuestas_fts_au': f"""
+        CREATE TRIGGER respuestas_fts_au AFTER UPDATE OF texto ON respuestas BEGIN
+            UPDATE {TABLA_BUSQUEDA}
+            SET respuestas = (SELECT group_concat(texto, ' ') FROM respuestas WHERE pregunta_id = new.pregunta_id)
+            WHERE rowid = new.pregunta_id;
+        END""",
+    'respuestas_fts_ad': f"""
+        CREATE TRIGGER respuestas_fts_ad AFTER DELETE ON respuestas BEGIN
+            UPDATE {TABLA_BUSQUEDA}
+            SET respuestas = coalesce(
+                (SELECT group_concat(texto, ' ') FROM respuestas WHERE pregunta_id = old.pregunta_id), '')
+            WHERE rowid = old.pregunta_id;
+        END""",
+    'materias_fts_au': f"""
+        CREATE TRIGGER materias_fts_au AFTER UPDATE OF nombre ON materias BEGIN
+            UPDATE {TABLA_BUSQUEDA} SET materia = new.nombre
+            WHERE rowid IN (SELECT id FROM preguntas WHERE materia_id = new.id);
+        END""",
+}
+
+# Es la base de datos que sirve server.js: se mantiene el journal en disco (el de
+# siempre, así backup-database.sh puede seguir copiando solo el .db) para que una
+# recarga interrumpida se deshaga sin dañar el archivo. Como la carga es una sola
+# transacción, synchronous = NORMAL cuesta pocas sincronizaciones
+_PRAGMAS = (
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -65536',
+)
+
+
+class ExportadorSQLite:
+    """Carga el banco de preguntas en SQLite con inserciones por lotes
+
+    Toda la recarga ocurre en una sola transacción: los datos anteriores se
+    borran al empezar y, si algo falla, se conservan intactos. Los ids se
+    asignan aquí mismo, así las filas se insertan con executemany sin tener
+    que consultar lastrowid. Igual que importData.js, una pregunta repetida
+    (misma materia y número) o una opción repetida se ignoran; las materias
+    con el mismo nombre se combinan en una sola.
+
+    El índice de búsqueda se llena a la par de las tablas. Si el SQLite de
+    Python no trae FTS5 se omite (busqueda queda en False) y server.js
+    busca con LIKE, como antes.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, lote=5000):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lote = lote
+        self.total_materias = 0
+        self.total_preguntas = 0
+        self.total_respuestas = 0
+
+        self.conn = sqlite3.connect(str(self.db_path), isolation_level=None)
+        for pragma in _PRAGMAS:
+            self.conn.execute(pragma)
+        self.conn.execute('BEGIN')
+        self._crear_esquema()
+        self.busqueda = self._crear_busqueda()
+        self.conn.execute('DELETE FROM respuestas')
+        self.conn.execute('DELETE FROM preguntas')
+        self.conn.execute('DELETE FROM materias')
+
+        self._materias = {}       # nombre -> id
+        self._preguntas = set()   # (materia_id, numero)
+        self._clave_actual = None
+        self._materia_id = None
+        self._filas_materias = []
+        self._filas_preguntas = []
+        self._filas_respuestas = []
+        self._filas_busqueda = []
+
+    def _crear_esquema(self):
+        # executescript haría COMMIT de la transacción abierta
+        for sentencia in _ESQUEMA.split(';'):
+            if sentencia.strip():
+                self.conn.execute(sentencia)
+        columnas = {fila[1] for fila in self.conn.execute('PRAGMA table_info(respuestas)')}
+        if 'es_correcta' not in columnas:
+            self.conn.execute('ALTER TABLE respuestas ADD COLUMN es_correcta INTEGER DEFAULT 0')
+
+    def _crear_busqueda(self):
+        """Vuelve a crear el índice de búsqueda vacío; False si no hay FTS5"""
+        # Sin los triggers el DELETE de las tablas no toca el índice fila por fila
+        for trigger in _TRIGGERS:
+            self.conn.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        self.conn.execute(f'DROP TABLE IF EXISTS {TABLA_BUSQUEDA}')
+        try:
+            self.conn.execute(_BUSQUEDA)
+        except sqlite3.OperationalError:
+            return False
+        return True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.conn.execute('ROLLBACK')
+            self.conn.close()
+
+    def _volcar(self):
+        """Inserta las filas acumuladas"""
+        if self._filas_materias:
+            self.conn.executemany('INSERT INTO materias (id, nombre) VALUES (?, ?)', self._filas_materias)
+            self._filas_materias = []
+        if self._filas_preguntas:
+            self.conn.executemany(
+                'INSERT INTO preguntas (id, materia_id, numero, texto) VALUES (?, ?, ?, ?)',
+                self._filas_preguntas)
+            self._filas_preguntas = []
+        if self._filas_respuestas:
+            self.conn.executemany(
+                'INSERT INTO respuestas (pregunta_id, opcion, texto, es_correcta) VALUES (?, ?, ?, 0)',
+                self._filas_respuestas)
+            self._filas_respuestas = []
+        if self._filas_busqueda:
+            self.conn.executemany(
+                f'INSERT INTO {TABLA_BUSQUEDA} (rowid, texto, respuestas, materia) VALUES (?, ?, ?, ?)',
+                self._filas_busqueda)
+            self._filas_busqueda = []
+
+    def escribir_pregunta(self, clave_materia, materia_nombre, pregunta):
+        """Agrega una pregunta (banco_modelo.Pregunta) con sus respuestas"""
+        if clave_materia != self._clave_actual or self._materia_id is None:
+            self._clave_actual = clave_materia
+            self._materia_id = self._materias.get(materia_nombre)
+            if self._materia_id is None:
+                self._materia_id = len(self._materias) + 1
+                self._materias[materia_nombre] = self._materia_id
+                self._filas_materias.append((self._materia_id, materia_nombre))
+                self.total_materias += 1
+
+        clave_pregunta = (self._materia_id, pregunta.numero)
+        if clave_pregunta in self._preguntas:
+            return
+        self._preguntas.add(clave_pregunta)
+        self.total_preguntas += 1
+        pregunta_id = self.total_preguntas
+        self._filas_preguntas.append((pregunta_id, self._materia_id, pregunta.numero, pregunta.texto))
+
+        opciones = set()
+        textos = []
+        for respuesta in pregunta.respuestas:
+            if respuesta.opcion in opciones:
+                continue
+            opciones.add(respuesta.opcion)
+            self._filas_respuestas.append((pregunta_id, respuesta.opcion, respuesta.texto))
+            textos.append(respuesta.texto)
+            self.total_respuestas += 1
+        if self.busqueda:
+            self._filas_busqueda.append((pregunta_id, pregunta.texto, ' '.join(textos), materia_nombre))
+
+        if len(self._filas_preguntas) + len(self._filas_respuestas) >= self.lote:
+            self._volcar()
+
+    def escribir_materia(self, materia):
+        """Agrega una materia completa (banco_modelo.Materia)"""
+        clave = object()
+        for pregunta in materia.preguntas:
+            self.escribir_pregunta(clave, materia.materia, pregunta)
+
+    def close(self):
+        """Inserta lo pendiente, crea los índices y los triggers de búsqueda y confirma la transacción"""
+        if self.conn is None:
+            return
+        self._volcar()
+        for sentencia in _INDICES.split(';'):
+            if sentencia.strip():
+                self.conn.execute(sentencia)
+        if self.busqueda:
+            for trigger in _TRIGGERS.values():
+                self.conn.execute(trigger)
+            # Une los segmentos que dejaron los lotes en un solo árbol
+            self.conn.execute(f"INSERT INTO {TABLA_BUSQUEDA} ({TABLA_BUSQUEDA}) VALUES ('optimize')")
+        self.conn.execute('COMMIT')
+        self.conn.close()
+        self.conn = None
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Escritura incremental del banco de preguntas
+Cada pregunta se escribe en cuanto el parser la entrega, sin armar antes el
+documento completo; los totales se cuentan al vuelo y van al final del JSON
+o, en NDJSON, a un archivo aparte
+"""
+
+import json
+import os
+from contextlib import ExitStack
+from json.encoder import encode_basestring
+from pathlib import Path
+
+from banco_delta import EscritorDelta, delta_path
+from banco_duplicados import MODOS as MODOS_DUPLICADOS, UMBRAL, DetectorDuplicados, duplicados_path
+from banco_fragmentos import MANIFIESTO, EscritorFragmentado
+from banco_indexado import EscritorIndexado
+from banco_modelo import EscritorPorMaterias
+from banco_sqlite import ExportadorSQLite
+
+# json: mismo formato que json.dump(indent=2) (el banco_preguntas.json de siempre)
+# compact: el mismo documento sin sangría ni espacios
+# ndjson: una pregunta por línea, con el nombre de su materia
+FORMATOS = ('json', 'compact', 'ndjson')
+
+
+def bloque_json(pregunta):
+    """Pregunta con la sangría de banco_preguntas.json, igual a json.dumps(indent=2)
+
+    Se arma directamente desde el registro: json.dumps con indent usa el
+    codificador en Python puro y era la mitad del tiempo de la conversión.
+    """
+    partes = ['        {\n          "numero": ', encode_basestring(pregunta.numero),
+              ',\n          "texto": ', encode_basestring(pregunta.texto)]
+    if pregunta.respuestas:
+        partes.append(',\n          "respuestas": [')
+        separador = '\n'
+        for respuesta in pregunta.respuestas:
+            partes += [separador, '            {\n              "opcion": ', encode_basestring(respuesta.opcion),
+                       ',\n              "texto": ', encode_basestring(respuesta.texto), '\n            }']
+            separador = ',\n'
+        partes.append('\n          ]\n        }')
+    else:
+        partes.append(',\n          "respuestas": []\n        }')
+    return ''.join(partes)
+
+
+def sidecar_path(output_path):
+    """Ruta del archivo con los totales de una salida NDJSON"""
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.stem + '.meta.json')
+
+
+class EscritorBanco(EscritorPorMaterias):
+    """Escribe el banco de preguntas pregunta a pregunta
+
+    Uso:
+        with EscritorBanco(output_path, 'json') as escritor:
+            for indice_materia, materia_nombre, pregunta in iter_preguntas(lines):
+                escritor.escribir_pregunta(indice_materia, materia_nombre, pregunta)
+
+    Con atomico el documento se escribe en <salida>.tmp y reemplaza a la
+    salida recién al cerrarse, así quien la lee nunca ve un archivo a medias.
+    """
+
+    def __init__(self, output_path, formato='json', atomico=False):
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato de salida desconocido: {formato}")
+        super().__init__()
+        self.output_path = Path(output_path)
+        self.formato = formato
+        self.atomico = atomico
+        self.resumen = []  # (materia, número de preguntas) en orden de aparición
+        self.total_preguntas = 0
+        self._ruta = self.output_path.with_name(self.output_path.name + '.tmp') if atomico else self.output_path
+        self._f = open(self._ruta, 'w', encoding='utf-8')
+
+        if formato == 'json':
+            self._f.write('{\n  "banco_preguntas": [')
+        elif formato == 'compact':
+            self._f.write('{"banco_preguntas":[')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._f.close()
+            if self.atomico:
+                # La salida anterior queda intacta
+                self._ruta.unlink(missing_ok=True)
+
+    @property
+    def total_materias(self):
+        return len(self.resumen)
+
+    def _abrir_materia(self, materia_nombre):
+        primera = not self.resumen
+        if not primera:
+            self._cerrar_materia()
+        self.resumen.append([materia_nombre, 0])
+        nombre = json.dumps(materia_nombre, ensure_ascii=False)
+        if self.formato == 'json':
+            self._f.write('\n' if primera else ',\n')
+            self._f.write(f'    {{\n      "materia": {nombre},\n      "preguntas": [')
+        elif self.formato == 'compact':
+            self._f.write('' if primera else ',')
+            self._f.write(f'{{"materia":{nombre},"preguntas":[')
+
+    def _cerrar_materia(self):
+        if self.formato == 'json':
+            self._f.write('\n      ]\n    }')
+        elif self.formato == 'compact':
+            self._f.write(']}')
+
+    def _agregar_pregunta(self, materia_nombre, pregunta):
+        primera = self.resumen[-1][1] == 0
+        if self.formato == 'json':
+            self._f.write('\n' if primera else ',\n')
+            self._f.write(bloque_json(pregunta))
+        elif self.formato == 'compact':
+            self._f.write('' if primera else ',')
+            self._f.write(json.dumps(pregunta.to_dict(), ensure_ascii=False, separators=(',', ':')))
+        else:
+            registro = {'materia': materia_nombre}
+            registro.update(pregunta.to_dict())
+            self._f.write(json.dumps(registro, ensure_ascii=False, separators=(',', ':')))
+            self._f.write('\n')
+
+        self.resumen[-1][1] += 1
+        self.total_preguntas += 1
+
+    def close(self):
+        """Cierra el documento escribiendo los totales"""
+        if self._f.closed:
+            return
+        if self.resumen:
+            self._cerrar_materia()
+
+        if self.formato == 'json':
+            self._f.write('\n  ],' if self.resumen else '],')
+            self._f.write(f'\n  "total_materias": {self.total_materias},')
+            self._f.write(f'\n  "total_preguntas": {self.total_preguntas}\n}}')
+        elif self.formato == 'compact':
+            self._f.write(f'],"total_materias":{self.total_materias},'
+                          f'"total_preguntas":{self.total_preguntas}}}')
+        else:
+            # En NDJSON los totales van en un archivo aparte
+            meta = {
+                'archivo': self.output_path.name,
+                'total_materias': self.total_materias,
+                'total_preguntas': self.total_preguntas,
+                'materias': [{'materia': nombre, 'total_preguntas': total}
+                             for nombre, total in self.resumen]
+            }
+            meta_path = sidecar_path(self.output_path)
+            meta_ruta = meta_path.with_name(meta_path.name + '.tmp') if self.atomico else meta_path
+            with open(meta_ruta, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False, indent=2)
+            if self.atomico:
+                os.replace(meta_ruta, meta_path)
+        self._f.close()
+        if self.atomico:
+            os.replace(self._ruta, self.output_path)
+
+
+class SalidaMultiple:
+    """Reparte cada pregunta entre varios escritores (JSON, SQLite, ...)
+
+    Los escritores solo necesitan escribir_pregunta, escribir_materia y
+    close; los totales se leen del primero. Con un detector de duplicados
+    (banco_duplicados) cada pregunta se revisa antes de repartirla y, si el
+    detector fusiona, las duplicadas no llegan a los escritores.
+    """
+
+    def __init__(self, escritores, duplicados=None):
+        self.escritores = list(escritores)
+        self.duplicados = duplicados
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        for escritor in self.escritores:
+            escritor.__exit__(exc_type, exc, tb)
+        if self.duplicados is not None:
+            self.duplicados.__exit__(exc_type, exc, tb)
+
+    def __getattr__(self, nombre):
+        # total_materias, total_preguntas, resumen...
+        return getattr(self.escritores[0], nombre)
+
+    def por_formato(self, formato):
+        """Escritor con ese formato ('json', 'indexado', 'delta', ...), o None"""
+        return next((e for e in self.escritores if getattr(e, 'formato', None) == formato), None)
+
+    def escribir_pregunta(self, clave_materia, materia_nombre, pregunta):
+        if self.duplicados is not None:
+            if self.duplicados.revisar(materia_nombre, pregunta) and self.duplicados.fusionar:
+                return
+        for escritor in self.escritores:
+            escritor.escribir_pregunta(clave_materia, materia_nombre, pregunta)
+
+    def escribir_materia(self, materia):
+        if self.duplicados is not None:
+            materia = self.duplicados.revisar_materia(materia)
+        for escritor in self.escritores:
+            escritor.escribir_materia(materia)
+
+    def close(self):
+        for escritor in self.escritores:
+            escritor.close()
+        if self.duplicados is not None:
+            self.duplicados.close()
+
+
+def abrir_salida(output_path, formato='json', sqlite_path=None, indexado_path=None, atomico=False, delta=False,
+                 duplicados=None, umbral_duplicados=UMBRAL, fragmentos_path=None):
+    """Escritor del banco en el formato pedido y, si se indican, del archivo indexado y de la base de datos SQLite
+
+    La base de datos, si la hay, es siempre el último escritor. Con atomico
+    los archivos reemplazan a los anteriores recién al cerrarse (la base de
+    datos ya se carga en una sola transacción). Con delta se guarda además
+    el delta respecto de la salida anterior en <salida>.delta.json. Con
+    duplicados ('marcar' o 'fusionar') las preguntas repetidas o casi
+    repetidas se informan en <salida>.duplicados.json y, al fusionar, se
+    escribe solo la primera aparición. Con fragmentos_path se escribe además
+    un JSON por materia y su manifiesto en ese directorio (banco_fragmentos).
+    """
+    # Si un escritor no se puede abrir, los ya abiertos se descartan (y borran sus temporales)
+    with ExitStack() as pila:
+        # El detector valida sus opciones antes de abrir (y truncar) ningún archivo
+        detector = None
+        if duplicados is not None:
+            if duplicados not in MODOS_DUPLICADOS:
+                raise ValueError(f"Modo de duplicados desconocido: {duplicados}")
+            detector = pila.enter_context(DetectorDuplicados(duplicados_path(output_path), umbral_duplicados,
+                                                             fusionar=duplicados == 'fusionar'))
+        # El delta lee la salida anterior antes de que se empiece a pisar
+        escritor_delta = pila.enter_context(EscritorDelta(delta_path(output_path), output_path)) if delta else None
+        escritores = [pila.enter_context(EscritorBanco(output_path, formato, atomico))]
+        if indexado_path is not None:
+            escritores.append(pila.enter_context(EscritorIndexado(indexado_path, atomico)))
+        if fragmentos_path is not None:
+            escritores.append(pila.enter_context(EscritorFragmentado(fragmentos_path, atomico)))
+        if escritor_delta is not None:
+            escritores.append(escritor_delta)
+        if sqlite_path is not None:
+            escritores.append(pila.enter_context(ExportadorSQLite(sqlite_path)))
+        pila.pop_all()
+    return SalidaMultiple(escritores, detector)
+
+
+def agregar_argumentos_salida(parser):
+    """Agrega a un argparse.ArgumentParser las opciones de salida comunes a los conversores (ver abrir_salida)"""
+    parser.add_argument('-o', '--output', type=Path, default=Path("banco_preguntas.json"),
+                        help="JSON de salida (por defecto: banco_preguntas.json)")
+    parser.add_argument('--format', choices=FORMATOS, default='json',
+                        help="json (con sangría, por defecto), compact (sin sangría) o ndjson (una pregunta por línea)")
+    parser.add_argument('--sqlite', type=Path, metavar='PATH',
+                        help="cargar también la base de datos SQLite de server.js (p. ej. database/banco_preguntas.db)")
+    parser.add_argument('--indexado', type=Path, metavar='PATH',
+                        help="escribir también el banco en formato binario indexado (p. ej. banco_preguntas.bpx; "
+                             "ver banco_indexado.py)")
+    parser.add_argument('--fragmentos', type=Path, metavar='DIR',
+                        help="escribir también un JSON por materia en ese directorio, con un manifest.json con los "
+                             "totales, el tamaño y el SHA-256 de cada materia (ver banco_fragmentos.py)")
+    parser.add_argument('--delta', action='store_true',
+                        help="guardar en <salida>.delta.json las preguntas agregadas, eliminadas y modificadas "
+                             "respecto de la salida anterior (ver banco_delta.py)")
+    parser.add_argument('--duplicados', choices=MODOS_DUPLICADOS,
+                        help="buscar preguntas repetidas o casi repetidas y listarlas en <salida>.duplicados.json; "
+                             "con 'fusionar' se escribe solo la primera aparición (ver banco_duplicados.py)")
+    parser.add_argument('--umbral-duplicados', type=float, default=UMBRAL, metavar='J',
+                        help=f"similitud mínima (Jaccard, de 0 a 1) para considerar duplicadas dos preguntas "
+                             f"(por defecto: {UMBRAL})")
+
+
+def imprimir_salidas(escritor, output_path, sqlite_path=None, indexado_path=None, fragmentos_path=None,
+                     emoji=True):
+    """Informa en la consola qué archivos escribió un escritor de abrir_salida, ya cerrado"""
+    def linea(icono, texto):
+        print(f"{icono}{texto}" if emoji else texto)
+
+    print()
+    linea('✅ ', f"JSON generado exitosamente: {output_path}")
+    if escritor.formato == 'ndjson':
+        linea('🧾 ', f"Totales guardados en: {sidecar_path(output_path)}")
+    if sqlite_path is not None:
+        db = escritor.escritores[-1]
+        linea('🗄️  ', f"Base de datos cargada: {sqlite_path} ({db.total_materias} materias, "
+                      f"{db.total_preguntas} preguntas, {db.total_respuestas} respuestas)")
+    if indexado_path is not None:
+        linea('🗂️  ', f"Banco indexado guardado en: {indexado_path}")
+    if fragmentos_path is not None:
+        fragmentos = escritor.por_formato('fragmentado').manifiesto
+        linea('🗃️  ', f"Materias por separado en: {fragmentos_path} ({fragmentos['total_materias']} archivos, "
+                      f"{fragmentos['bytes']} bytes; manifiesto: {Path(fragmentos_path) / MANIFIESTO})")
+    escritor_delta = escritor.por_formato('delta')
+    if escritor_delta is not None:
+        cambios = escritor_delta.totales()
+        linea('🧩 ', f"Delta guardado en: {escritor_delta.path} ({cambios['agregadas']} agregadas, "
+                    f"{cambios['eliminadas']} eliminadas, {cambios['modificadas']} modificadas)")
+    if escritor.duplicados is not None:
+        repetidas = escritor.duplicados.totales()
+        accion = 'descartadas' if escritor.duplicados.fusionar else 'marcadas'
+        linea('🔁 ', f"Duplicadas {accion}: {repetidas['duplicadas']} ({repetidas['exactas']} exactas, "
+                    f"{repetidas['similares']} parecidas) en {repetidas['grupos']} grupos; "
+                    f"reporte en: {duplicados_path(output_path)}")
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de los conversores del banco de preguntas
+Genera bancos sintéticos de distintos tamaños, mide líneas/s, preguntas/s y
+memoria pico (RSS) de cada conversor y guarda los resultados en un historial
+para comparar una ejecución con la anterior
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import resource
+import subprocess
+import sys
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+from banco_cache import DEFAULT_CACHE_DIR
+from generar_banco_sintetico import generar_banco
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_HISTORIAL = Path('benchmark_historial.jsonl')
+
+
+def _caso_txt(txt_path, output_path):
+    """txt_to_json completo: lectura, parseo y escritura del JSON"""
+    import txt_to_json
+    with open(os.devnull, 'w') as nulo, redirect_stdout(nulo):
+        totales = txt_to_json.process_txt_to_json(txt_path, output_path)
+    return totales['total_preguntas']
+
+
+def _caso_pdf(txt_path, output_path):
+    """Parte de pdf_to_json posterior a la extracción: parseo del texto y escritura del JSON"""
+    from banco_parser import DIALECTO_PDF, iter_preguntas
+    from banco_writer import EscritorBanco
+    with open(txt_path, 'r', encoding='utf-8') as entrada, EscritorBanco(output_path) as escritor:
+        for indice_materia, materia_nombre, pregunta in iter_preguntas(entrada, DIALECTO_PDF):
+            escritor.escribir_pregunta(indice_materia, materia_nombre, pregunta)
+    return escritor.total_preguntas
+
+
+CASOS = {
+    'txt': _caso_txt,
+    'pdf': _caso_pdf,
+}
+
+
+def _rss_pico_mb():
+    """Memoria residente pico del proceso actual, en MB"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux la da en KB, macOS en bytes
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def _ejecutar_caso(caso, txt_path, output_path, cola):
+    """Corre un caso en un proceso nuevo para que el RSS pico sea solo suyo"""
+    inicio = time.perf_counter()
+    preguntas = CASOS[caso](txt_path, output_path)
+    segundos = time.perf_counter() - inicio
+    cola.put({'segundos': segundos, 'preguntas': preguntas, 'rss_mb': _rss_pico_mb()})
+
+
+def medir(caso, txt_path, output_path):
+    """Mide un caso en un proceso aparte; devuelve segundos, preguntas y RSS pico"""
+    ctx = multiprocessing.get_context('spawn')
+    cola = ctx.Queue()
+    proceso = ctx.Process(target=_ejecutar_caso, args=(caso, str(txt_path), str(output_path), cola))
+    proceso.start()
+    # Un caso que falla termina sin poner nada en la cola: se espera mientras siga vivo
+    resultado = None
+    while True:
+        vivo = proceso.is_alive()
+        try:
+            resultado = cola.get(timeout=0.5)
+            break
+        except queue.Empty:
+            # Si ya había terminado antes de esperar, su resultado tendría que estar en la cola
+            if not vivo:
+                break
+    proceso.join()
+    if proceso.exitcode != 0 or resultado is None:
+        raise RuntimeError(f"El caso {caso} terminó con código {proceso.exitcode}")
+    return resultado
+
+
+def _contar_lineas(path):
+    with open(path, 'rb') as f:
+        return sum(bloque.count(b'\n') for bloque in iter(lambda: f.read(1 << 20), b''))
+
+
+def banco_sintetico(num_preguntas, seed, directorio):
+    """Ruta de un banco sintético, generándolo solo la primera vez"""
+    directorio.mkdir(parents=True, exist_ok=True)
+    path = directorio / f"banco_{num_preguntas}_{seed}.txt"
+    if not path.exists():
+        tmp = path.with_suffix('.tmp')
+        generar_banco(tmp, num_preguntas, seed=seed)
+        tmp.replace(path)
+    return path
+
+
+def _commit_actual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _ultima_ejecucion(historial):
+    """Resultados de la ejecución anterior, por (caso, preguntas)"""
+    if not historial.exists():
+        return {}
+    ultima = None
+    with open(historial, 'r', encoding='utf-8') as f:
+        for linea in f:
+            if linea.strip():
+                ultima = json.loads(linea)
+    if ultima is None:
+        return {}
+    return {(r['caso'], r['preguntas']): r for r in ultima['resultados']}
+
+
+def run_benchmark(sizes=DEFAULT_SIZES, casos=tuple(CASOS), repeticiones=3, seed=0,
+                  directorio=DEFAULT_CACHE_DIR / 'sinteticos', historial=DEFAULT_HISTORIAL):
+    """Ejecuta el benchmark, imprime la tabla y agrega la ejecución al historial"""
+    anterior = _ultima_ejecucion(historial) if historial else {}
+    resultados = []
+
+    print(f"{'caso':<6} {'preguntas':>10} {'líneas':>10} {'seg':>8} {'líneas/s':>12} "
+          f"{'preguntas/s':>12} {'RSS MB':>8} {'vs anterior':>12}")
+    for num_preguntas in sizes:
+        txt_path = banco_sintetico(num_preguntas, seed, directorio)
+        num_lineas = _contar_lineas(txt_path)
+        output_path = directorio / f"salida_{num_preguntas}.json"
+        for caso in casos:
+            # Se queda con la repetición más rápida
+            mejor = min((medir(caso, txt_path, output_path) for _ in range(repeticiones)),
+                        key=lambda r: r['segundos'])
+            resultado = {
+                'caso': caso,
+                'preguntas': num_preguntas,
+                'lineas': num_lineas,
+                'segundos': round(mejor['segundos'], 4),
+                'lineas_por_segundo': round(num_lineas / mejor['segundos']),
+                'preguntas_por_segundo': round(mejor['preguntas'] / mejor['segundos']),
+                'rss_pico_mb': round(mejor['rss_mb'], 1),
+            }
+            resultados.append(resultado)
+
+            previo = anterior.get((caso, num_preguntas))
+            cambio = ''
+            if previo:
+                cambio = f"{(resultado['lineas_por_segundo'] / previo['lineas_por_segundo'] - 1) * 100:+.1f}%"
+            print(f"{caso:<6} {num_preguntas:>10} {num_lineas:>10} {resultado['segundos']:>8.3f} "
+                  f"{resultado['lineas_por_segundo']:>12,} {resultado['preguntas_por_segundo']:>12,} "
+                  f"{resultado['rss_pico_mb']:>8.1f} {cambio:>12}")
+        output_path.unlink(missing_ok=True)
+
+    if historial:
+        registro = {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'commit': _commit_actual(),
+            'python': platform.python_version(),
+            'resultados': resultados,
+        }
+        with open(historial, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+        print(f"\nResultados agregados a {historial}")
+    return resultados
+
+
+def parse_args(argv=None):
+    """Argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Benchmark de txt_to_json y pdf_to_json sobre bancos sintéticos")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), metavar='N',
+                        help="tamaños del banco en preguntas (por defecto: 1000 10000 100000; hasta 1000000)")
+    parser.add_argument('--casos', nargs='+', choices=sorted(CASOS), default=list(CASOS),
+                        help="conversores a medir (por defecto: todos)")
+    parser.add_argument('--repeticiones', type=int, default=3,
+                        help="repeticiones por caso; se informa la más rápida (por defecto: 3)")
+    parser.add_argument('--seed', type=int, default=0, help="semilla de los bancos sintéticos")
+    parser.add_argument('--historial', type=Path, default=DEFAULT_HISTORIAL,
+                        help=f"archivo JSONL con las ejecuciones anteriores (por defecto: {DEFAULT_HISTORIAL})")
+    parser.add_argument('--no-historial', action='store_true',
+                        help="no leer ni guardar el historial")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run_benchmark(args.sizes, args.casos, args.repeticiones, args.seed,
+                  historial=None if args.no_historial else args.historial)
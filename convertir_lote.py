@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Conversión por lotes de bancos de preguntas TXT y PDF
+Convierte todos los archivos de un directorio o de un patrón glob en un pool
+de procesos y combina el resultado en un solo banco_preguntas, juntando las
+materias con el mismo nombre
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from itertools import repeat
+from pathlib import Path
+
+from banco_cache import DEFAULT_CACHE_DIR, CacheBanco
+from banco_duplicados import UMBRAL
+from banco_lector import LectorTXT
+from banco_modelo import Materia, Pregunta
+from banco_parser import DIALECTO_PDF, DIALECTO_TXT, iter_materias
+from banco_pdf import PREFERENCIA
+from banco_writer import abrir_salida, agregar_argumentos_salida, imprimir_salidas
+from pdf_to_json import iter_lines_from_pages, iter_pages_from_pdf
+
+EXTENSIONES = ('.txt', '.pdf')
+
+
+def lote_path(output_path):
+    """Ruta del reporte por archivo de una conversión por lotes"""
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.stem + '.lote.json')
+
+
+def buscar_entradas(patrones):
+    """Archivos TXT/PDF de una lista de directorios, patrones glob o archivos, sin repetir"""
+    entradas = []
+    vistas = set()
+    for patron in patrones:
+        path = Path(patron)
+        if path.is_dir():
+            encontrados = sorted(p for p in path.iterdir() if p.suffix.lower() in EXTENSIONES)
+        elif path.is_file():
+            encontrados = [path]
+        else:
+            encontrados = sorted(Path(p) for p in glob.glob(patron, recursive=True)
+                                 if Path(p).suffix.lower() in EXTENSIONES and Path(p).is_file())
+        for encontrado in encontrados:
+            if encontrado.resolve() not in vistas:
+                vistas.add(encontrado.resolve())
+                entradas.append(encontrado)
+    return entradas
+
+
+def convertir_archivo(path, cache_dir=None, backend=None):
+    """Convierte un TXT o PDF; devuelve (materias, segundos)
+
+    Se ejecuta dentro de cada proceso del pool. A diferencia de pdf_to_json,
+    no escribe texto_extraido.txt: varios procesos lo pisarían.
+    """
+    inicio = time.perf_counter()
+    path = Path(path)
+    if path.suffix.lower() == '.pdf':
+        with CacheBanco(cache_dir) if cache_dir is not None else nullcontext() as cache:
+            pages = iter_pages_from_pdf(path, cache=cache, backend=backend)
+            materias = list(iter_materias(iter_lines_from_pages(pages), DIALECTO_PDF))
+    else:
+        with LectorTXT(path) as entrada:
+            materias = list(iter_materias(entrada, DIALECTO_TXT))
+    return materias, time.perf_counter() - inicio
+
+
+def _resultado(path, materias=None, segundos=None, error=None):
+    return {
+        'archivo': str(path),
+        'tipo': path.suffix.lower().lstrip('.'),
+        'materias': len(materias) if materias is not None else 0,
+        'preguntas': sum(len(m.preguntas) for m in materias) if materias is not None else 0,
+        'segundos': round(segundos, 4) if segundos is not None else None,
+        'error': error,
+    }
+
+
+def _imprimir_resultado(resultado):
+    if resultado['error']:
+        print(f"  ❌ {resultado['archivo']}: {resultado['error']}")
+    else:
+        print(f"  ✅ {resultado['archivo']}: {resultado['materias']} materias, "
+              f"{resultado['preguntas']} preguntas ({resultado['segundos']:.2f} s)")
+
+
+def fuentes_banco(entradas):
+    """Nombre de cada archivo en los números de un banco combinado: sin extensión, o la ruta si dos lo comparten"""
+    entradas = [Path(e) for e in entradas]
+    nombres = Counter(path.stem for path in entradas)
+    return [path.stem if nombres[path.stem] == 1 else str(path) for path in entradas]
+
+
+def combinar_materias(listas, fuentes=None):
+    """Junta las materias de varios bancos por nombre, en orden de aparición
+
+    Los nombres se comparan sin distinguir mayúsculas ("Gestión De Redes" del
+    TXT y "Gestión de redes" del PDF son la misma materia); se conserva el
+    primero que aparece. Cada periodo numera sus preguntas desde 1: con
+    fuentes (un nombre por banco, ver fuentes_banco) el número de cada
+    pregunta lleva el de su banco ("3 (periodo-2024)"), así las de distintos
+    bancos no chocan en la base de datos, el delta ni el banco indexado, y no
+    cambian cuando otro banco gana o pierde preguntas. Sin fuentes los
+    números quedan como están.
+    """
+    combinadas = {}
+    for materias, fuente in zip(listas, fuentes or repeat(None)):
+        for materia in materias:
+            clave = materia.materia.casefold()
+            destino = combinadas.get(clave)
+            if destino is None:
+                destino = combinadas[clave] = Materia(materia.materia)
+            if fuente is None:
+                destino.preguntas.extend(materia.preguntas)
+            else:
+                # Preguntas nuevas: las de cada banco pueden seguir en uso (p. ej. en vigilar_banco)
+                destino.preguntas.extend(Pregunta(f"{p.numero} ({fuente})", p.texto, p.respuestas)
+                                         for p in materia.preguntas)
+    return list(combinadas.values())
+
+
+def _reporte(output_path, resultados, inicio, errores, total_materias=0, total_preguntas=0):
+    return {
+        'salida': str(output_path),
+        'salida_escrita': not errores,
+        'total_archivos': len(resultados),
+        'archivos_con_error': errores,
+        'total_materias': total_materias,
+        'total_preguntas': total_preguntas,
+        'segundos': round(time.perf_counter() - inicio, 4),
+        'segundos_por_archivo_sumados': round(sum(r['segundos'] or 0 for r in resultados), 4),
+        'archivos': resultados,
+    }
+
+
+def convertir_lote(entradas, output_path, workers=None, cache_dir=None, formato='json', sqlite_path=None,
+                   backend=None, indexado_path=None, delta=False, duplicados=None, umbral_duplicados=UMBRAL,
+                   fragmentos_path=None):
+    """Convierte varios bancos en paralelo y escribe un solo banco combinado
+
+    Cada archivo se convierte en un proceso del pool, así el lote tarda
+    aproximadamente lo que el archivo más lento. Un archivo con errores no
+    detiene las demás conversiones y queda registrado en el reporte, pero
+    entonces no se escribe ninguna salida: el banco combinado no tendría sus
+    preguntas y la base de datos las perdería. Las opciones de salida son las
+    de banco_writer.abrir_salida. Devuelve el reporte, que también se guarda
+    en <salida>.lote.json.
+    """
+    entradas = [Path(e) for e in entradas]
+    workers = workers or os.cpu_count() or 1
+    inicio = time.perf_counter()
+    materias_por_archivo = [None] * len(entradas)
+    resultados = [None] * len(entradas)
+
+    print(f"Convirtiendo {len(entradas)} archivos con {min(workers, len(entradas))} procesos...")
+    if workers <= 1 or len(entradas) <= 1:
+        for i, path in enumerate(entradas):
+            try:
+                materias, segundos = convertir_archivo(path, cache_dir, backend)
+                materias_por_archivo[i] = materias
+                resultados[i] = _resultado(path, materias, segundos)
+            except Exception as e:
+                resultados[i] = _resultado(path, error=str(e) or type(e).__name__)
+            _imprimir_resultado(resultados[i])
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(entradas))) as pool:
+            futures = {pool.submit(convertir_archivo, str(path), cache_dir, backend): i
+                       for i, path in enumerate(entradas)}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    materias, segundos = future.result()
+                    materias_por_archivo[i] = materias
+                    resultados[i] = _resultado(entradas[i], materias, segundos)
+                except Exception as e:
+                    resultados[i] = _resultado(entradas[i], error=str(e) or type(e).__name__)
+                _imprimir_resultado(resultados[i])
+
+    errores = sum(1 for r in resultados if r['error'])
+    if errores:
+        reporte = _reporte(output_path, resultados, inicio, errores)
+        with open(lote_path(output_path), 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, ensure_ascii=False, indent=2)
+        print(f"\n❌ {errores} de {len(entradas)} archivos con errores: no se escribió {output_path} "
+              f"(las salidas anteriores quedan como estaban)")
+        print(f"🧾 Reporte por archivo: {lote_path(output_path)}")
+        return reporte
+
+    # Se combinan en el orden de las entradas, no en el de finalización
+    materias = combinar_materias(materias_por_archivo, fuentes_banco(entradas) if len(entradas) > 1 else None)
+    with abrir_salida(output_path, formato, sqlite_path, indexado_path, atomico=True, delta=delta,
+                      duplicados=duplicados, umbral_duplicados=umbral_duplicados,
+                      fragmentos_path=fragmentos_path) as escritor:
+        for materia in materias:
+            escritor.escribir_materia(materia)
+
+    reporte = _reporte(output_path, resultados, inicio, 0, escritor.total_materias, escritor.total_preguntas)
+    with open(lote_path(output_path), 'w', encoding='utf-8') as f:
+        json.dump(reporte, f, ensure_ascii=False, indent=2)
+
+    imprimir_salidas(escritor, output_path, sqlite_path, indexado_path, fragmentos_path)
+    print(f"🧾 Reporte por archivo: {lote_path(output_path)}")
+    print(f"📊 Total de materias: {escritor.total_materias}")
+    print(f"📊 Total de preguntas: {escritor.total_preguntas}")
+    print(f"⏱️  {reporte['segundos']:.2f} s (suma por archivo: {reporte['segundos_por_archivo_sumados']:.2f} s)")
+
+    return reporte
+
+
+def parse_args(argv=None):
+    """Argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(
+        description="Convierte varios bancos TXT/PDF en paralelo y los combina en un solo JSON")
+    parser.add_argument('entradas', nargs='+',
+                        help="directorios, patrones glob (entre comillas, p. ej. 'bancos/**/*.txt') o archivos")
+    agregar_argumentos_salida(parser)
+    parser.add_argument('--workers', type=int, default=None, metavar='N',
+                        help="procesos en paralelo (por defecto: uno por CPU)")
+    parser.add_argument('--cache', type=Path, default=DEFAULT_CACHE_DIR, metavar='DIR',
+                        help=f"directorio de la caché de texto por página de los PDF (por defecto: {DEFAULT_CACHE_DIR})")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="extraer todas las páginas de los PDF sin usar la caché")
+    parser.add_argument('--backend', choices=['auto'] + PREFERENCIA, default='auto',
+                        help="librería de PDF (por defecto: la más rápida instalada)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    entradas = buscar_entradas(args.entradas)
+    if not entradas:
+        print("❌ Error: No se encontraron archivos TXT ni PDF en: " + ', '.join(args.entradas))
+        sys.exit(1)
+
+    try:
+        reporte = convertir_lote(entradas, args.output, workers=args.workers,
+                                 cache_dir=None if args.no_cache else args.cache,
+                                 formato=args.format,
+                                 sqlite_path=args.sqlite,
+                                 indexado_path=args.indexado,
+                                 fragmentos_path=args.fragmentos,
+                                 delta=args.delta,
+                                 duplicados=args.duplicados,
+                                 umbral_duplicados=args.umbral_duplicados,
+                                 backend=args.backend)
+    except Exception as e:
+        print(f"❌ Error al combinar los bancos: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    sys.exit(1 if reporte['archivos_con_error'] else 0)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Generador de bancos de preguntas sintéticos para pruebas de rendimiento
+Produce un TXT con todos los formatos que aceptan los conversores:
+"Pregunta N:", "Pregunta N" con el texto en la línea siguiente, "N.",
+opciones "A:" y "a)", viñetas • y \uf0b7, líneas de continuación y varias
+materias con sus cabeceras "Banco de Preguntas"
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+_PALABRAS = (
+    'sistema proceso memoria datos red protocolo algoritmo función módulo '
+    'información gestión proyecto software arquitectura interrupción '
+    'transacción consulta índice tabla relación capa transporte enlace '
+    'servidor cliente dirección paquete archivo directorio núcleo planificación '
+    'requisito diseño prueba calidad riesgo análisis modelo aprendizaje '
+    'clasificación regresión neurona programación clase objeto herencia '
+    'interfaz patrón compilador variable puntero recursión estructura'
+).split()
+
+_MATERIAS = (
+    'Sistemas Operativos', 'Arquitectura de Computadoras', 'Base de Datos',
+    'Gestión de Redes', 'Ingeniería del Software y Gestión de Proyectos',
+    'Inteligencia Artificial', 'Sistemas de Información',
+    'Metodología de la Programación', 'Programación Avanzada',
+)
+
+# Estilos de pregunta / opciones que reconocen los parsers
+_ESTILOS = ('pregunta', 'pregunta_sola', 'numerada', 'vineta', 'vineta_especial')
+
+
+def _frase(rng, minimo, maximo):
+    return ' '.join(rng.choice(_PALABRAS) for _ in range(rng.randint(minimo, maximo)))
+
+
+def _envolver(texto, ancho):
+    """Parte un texto en líneas de como mucho `ancho` caracteres (líneas de continuación)"""
+    lineas = []
+    actual = []
+    largo = 0
+    for palabra in texto.split():
+        if actual and largo + len(palabra) + 1 > ancho:
+            lineas.append(' '.join(actual))
+            actual = []
+            largo = 0
+        actual.append(palabra)
+        largo += len(palabra) + 1
+    if actual:
+        lineas.append(' '.join(actual))
+    return lineas
+
+
+def _cabecera(rng, indice):
+    nombre = _MATERIAS[indice % len(_MATERIAS)]
+    if indice >= len(_MATERIAS):
+        nombre = f"{nombre} {indice // len(_MATERIAS) + 1}"
+    forma = rng.randrange(3)
+    if forma == 0:
+        return f"Banco de Preguntas: {nombre}"
+    if forma == 1:
+        return f"Banco de Preguntas {nombre}"
+    return f"BANCO DE PREGUNTAS GENERADO {nombre.upper()}"
+
+
+def iter_lineas_banco(num_preguntas, num_materias=9, seed=0, ancho=90):
+    """Genera, línea a línea, un banco con num_preguntas repartidas en num_materias"""
+    rng = random.Random(seed)
+    num_materias = max(1, min(num_materias, num_preguntas or 1))
+    por_materia, extra = divmod(num_preguntas, num_materias)
+
+    yield 'MÓDULO: TITULACIÓN INGENIERÍA EN SISTEMAS,'
+    yield 'PREGRADO – EXAMEN COMPLEXIVO'
+    for indice in range(num_materias):
+        yield _cabecera(rng, indice)
+        estilo = _ESTILOS[indice % len(_ESTILOS)]
+        for numero in range(1, por_materia + (1 if indice < extra else 0) + 1):
+            enunciado = _envolver(_frase(rng, 8, 40) + '?', ancho)
+            opciones = [_frase(rng, 1, 14) for _ in range(rng.choice((4, 4, 4, 5)))]
+
+            if estilo == 'pregunta_sola':
+                yield f"Pregunta {numero}"
+                yield from enunciado
+            elif estilo == 'numerada':
+                yield f"{numero}. {enunciado[0]}"
+                yield from enunciado[1:]
+            else:
+                yield f"Pregunta {numero}: {enunciado[0]}"
+                yield from enunciado[1:]
+
+            for k, opcion in enumerate(opciones):
+                letra = chr(ord('A') + k)
+                partes = _envolver(opcion, ancho)
+                if estilo == 'numerada':
+                    primera = f"{letra.lower()}) {partes[0]}"
+                elif estilo == 'vineta':
+                    primera = f"• {partes[0]}"
+                elif estilo == 'vineta_especial':
+                    primera = f"\uf0b7 {partes[0]}"
+                else:
+                    primera = f"{letra}: {partes[0]}"
+                yield primera
+                yield from partes[1:]
+
+
+def generar_banco(output_path, num_preguntas, num_materias=9, seed=0):
+    """Escribe un banco sintético en output_path; devuelve el número de líneas"""
+    num_lineas = 0
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for linea in iter_lineas_banco(num_preguntas, num_materias, seed):
+            f.write(linea)
+            f.write('\n')
+            num_lineas += 1
+    return num_lineas
+
+
+def parse_args(argv=None):
+    """Argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Genera un banco de preguntas sintético en TXT")
+    parser.add_argument('output', type=Path, help="TXT de salida")
+    parser.add_argument('-n', '--preguntas', type=int, default=1000,
+                        help="número total de preguntas (por defecto: 1000)")
+    parser.add_argument('--materias', type=int, default=9,
+                        help="número de materias (por defecto: 9)")
+    parser.add_argument('--seed', type=int, default=0, help="semilla aleatoria (por defecto: 0)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        num_lineas = generar_banco(args.output, args.preguntas, args.materias, args.seed)
+    except OSError as e:
+        print(f"❌ Error al escribir el banco: {e}")
+        sys.exit(1)
+    print(f"✅ Banco sintético generado: {args.output} ({args.preguntas} preguntas, {num_lineas} líneas)")
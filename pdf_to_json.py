@@ -5,285 +5,308 @@ Programa para convertir el banco de preguntas PDF a JSON
 Extrae materias, preguntas y respuestas del PDF
 """
 
-import json
-import re
+import argparse
+import multiprocessing
+import queue
 import sys
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
 
-# Intentar importar diferentes librerías de PDF
-pdf_library = None
-try:
-    import pdfplumber
-    pdf_library = 'pdfplumber'
-except ImportError:
+from banco_cache import DEFAULT_CACHE_DIR, CacheBanco, hash_file
+from banco_duplicados import UMBRAL
+from banco_parser import DIALECTO_PDF, iter_materias, iter_preguntas
+from banco_pdf import PREFERENCIA, comparar_backends, obtener_backend
+from banco_perfil import Perfil, imprimir_reporte, perfil_path
+from banco_writer import abrir_salida, agregar_argumentos_salida, imprimir_salidas
+
+# Páginas que el hilo de extracción puede adelantar al parseo
+PROFUNDIDAD_COLA = 8
+_FIN = object()
+
+# Los procesos de extracción se lanzan desde el hilo productor: con fork
+# heredarían una copia de los locks que otros hilos tengan tomados en ese
+# momento, así que se arrancan con spawn (como benchmark_conversores.medir)
+_CONTEXTO = multiprocessing.get_context('spawn')
+
+
+def count_pages(pdf_path, backend=None):
+    """Devuelve el número de páginas del PDF"""
+    return obtener_backend(backend).contar_paginas(pdf_path)
+
+
+def _extract_pages(pdf_path, page_numbers, backend=None):
+    """Extrae el texto de las páginas indicadas abriendo el documento por su cuenta
+
+    Se ejecuta dentro de cada proceso del pool, por eso recibe la ruta y el
+    nombre del backend y no un documento ya abierto. Devuelve una lista con el
+    texto de cada página.
+    """
+    return obtener_backend(backend).extraer_paginas(pdf_path, page_numbers)
+
+
+def page_content_hashes(pdf_path, backend=None):
+    """Hash del contenido bruto de cada página, sin extraer su texto
+
+    Leer los content streams es mucho más barato que extraer el texto, y
+    permite reconocer las páginas que no cambiaron entre dos versiones del PDF.
+    """
+    return obtener_backend(backend).hashes_paginas(pdf_path)
+
+
+def _split_range(total, parts):
+    """Divide range(total) en como mucho `parts` tramos contiguos de tamaño parecido"""
+    parts = max(1, min(parts, total))
+    size, extra = divmod(total, parts)
+    ranges = []
+    start = 0
+    for k in range(parts):
+        end = start + size + (1 if k < extra else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def _extract_pages_to_queue(pdf_path, page_numbers, backend, cola):
+    """Proceso de extracción: pone en la cola el texto de cada página, con el documento abierto una sola vez"""
     try:
-        import PyPDF2
-        pdf_library = 'PyPDF2'
-    except ImportError:
-        try:
-            import fitz  # PyMuPDF
-            pdf_library = 'PyMuPDF'
-        except ImportError:
-            print("Error: No se encontró ninguna librería de PDF instalada.")
-            print("Por favor instala una de las siguientes:")
-            print("  pip install pdfplumber")
-            print("  pip install PyPDF2")
-            print("  pip install PyMuPDF")
-            sys.exit(1)
-
-
-def extract_text_from_pdf(pdf_path):
-    """Extrae todo el texto del PDF"""
-    text = ""
-    
-    if pdf_library == 'pdfplumber':
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-    elif pdf_library == 'PyPDF2':
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-    elif pdf_library == 'PyMuPDF':
-        doc = fitz.open(pdf_path)
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            page_text = page.get_text()
-            if page_text:
-                text += page_text + "\n"
-        doc.close()
+        for page_text in obtener_backend(backend).iter_paginas(pdf_path, page_numbers):
+            cola.put(page_text)
+    except Exception as e:
+        cola.put(RuntimeError(f"Error al extraer las páginas: {type(e).__name__}: {e}"))
+
+
+def _iter_pages_subprocess(pdf_path, page_numbers, backend=None):
+    """Entrega el texto de las páginas indicadas mientras otro proceso las sigue extrayendo"""
+    cola = _CONTEXTO.Queue(maxsize=PROFUNDIDAD_COLA)
+    proceso = _CONTEXTO.Process(target=_extract_pages_to_queue, daemon=True,
+                                args=(str(pdf_path), page_numbers, backend, cola))
+    proceso.start()
+    try:
+        for _ in page_numbers:
+            while True:
+                try:
+                    page_text = cola.get(timeout=0.5)
+                    break
+                except queue.Empty:
+                    if not proceso.is_alive() and cola.empty():
+                        raise RuntimeError(f"El proceso de extracción terminó con código {proceso.exitcode}")
+            if isinstance(page_text, Exception):
+                raise page_text
+            yield page_text
+    finally:
+        if proceso.is_alive():
+            proceso.terminate()
+        proceso.join()
+
+
+def _iter_page_list(pdf_path, page_numbers, workers, backend=None, en_procesos=False):
+    """Entrega el texto de las páginas indicadas en orden, a medida que se extraen
+
+    Con workers > 1 las páginas se reparten entre procesos; solo hay unos
+    pocos tramos en vuelo a la vez, así no se acumula el documento entero.
+    Con en_procesos y workers = 1 la extracción ocurre en un único proceso
+    aparte que abre el documento una sola vez.
+    """
+    page_numbers = list(page_numbers)
+    if workers <= 1 or len(page_numbers) <= 1:
+        if en_procesos and page_numbers:
+            yield from _iter_pages_subprocess(pdf_path, page_numbers, backend)
+        else:
+            yield from obtener_backend(backend).iter_paginas(pdf_path, page_numbers)
+        return
+
+    # Varios tramos por proceso para repartir mejor las páginas lentas
+    chunks = [page_numbers[start:end] for start, end in _split_range(len(page_numbers), workers * 4)]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_CONTEXTO) as pool:
+        pendientes = deque()
+        for chunk in chunks:
+            pendientes.append(pool.submit(_extract_pages, str(pdf_path), chunk, backend))
+            if len(pendientes) > workers * 2:
+                yield from pendientes.popleft().result()
+        while pendientes:
+            yield from pendientes.popleft().result()
+
+
+def iter_pages_from_pdf(pdf_path, workers=1, cache=None, backend=None, en_procesos=False):
+    """Entrega el texto de cada página del PDF, en orden, a medida que se extrae
+
+    Con workers > 1 las páginas se reparten entre un pool de procesos; cada
+    proceso abre el documento por su cuenta y los tramos se vuelven a unir en
+    orden de página. Con una CacheBanco, un PDF ya visto no se vuelve a
+    decodificar y de uno modificado solo se extraen las páginas que cambiaron;
+    las páginas se van guardando en la caché por lotes a medida que se
+    obtienen (ver CacheBanco.guardar_pagina). backend es el nombre
+    de un backend de banco_pdf; por defecto el más rápido instalado. Con
+    en_procesos la extracción ocurre siempre en otros procesos, aunque workers
+    sea 1, y avanza en paralelo con quien consume las páginas.
+    """
+    backend = obtener_backend(backend).nombre
+    if cache is None:
+        yield from _iter_page_list(pdf_path, range(count_pages(pdf_path, backend)), workers, backend,
+                                   en_procesos)
+        return
     
-    return text
-
-
-def extract_respuestas_from_text(texto_pregunta):
-    """Extrae respuestas que están incrustadas en el texto de la pregunta"""
-    respuestas = []
-    # Buscar patrones de bullet (• o \uf0b7) seguido de texto
-    # El carácter puede ser • (U+2022) o \uf0b7 (bullet de fuente especial)
-    patrones = re.finditer(r'[\uf0b7•]\s+([^\uf0b7•]+?)(?=[\uf0b7•]|$)', texto_pregunta)
-    for match in patrones:
-        respuesta_texto = match.group(1).strip()
-        if respuesta_texto and len(respuesta_texto) > 2:  # Filtrar respuestas muy cortas
-            letra = chr(ord('A') + len(respuestas))
-            if letra <= 'E':
-                respuestas.append({
-                    'opcion': letra,
-                    'texto': respuesta_texto
-                })
+    doc_hash = hash_file(pdf_path)
+    pages = cache.iter_paginas_documento(doc_hash, backend)
+    if pages is not None:
+        print("Texto de las páginas tomado de la caché")
+        yield from pages
+        return
     
-    # Si se encontraron respuestas, limpiar el texto de la pregunta
-    if respuestas:
-        # Remover las respuestas del texto de la pregunta
-        texto_limpio = re.sub(r'[\uf0b7•]\s+[^\uf0b7•]+', '', texto_pregunta).strip()
-        return texto_limpio, respuestas
+    page_hashes = page_content_hashes(pdf_path, backend)
+    missing = [page_num for page_num, page_hash in enumerate(page_hashes)
+               if not cache.tiene_pagina(page_hash, backend)]
+    print(f"Páginas en caché: {len(page_hashes) - len(missing)}/{len(page_hashes)}")
+    extracted = _iter_page_list(pdf_path, missing, workers, backend, en_procesos)
+    missing = set(missing)
+    for page_num, page_hash in enumerate(page_hashes):
+        if page_num in missing:
+            page_text = next(extracted)
+        else:
+            page_text = cache.texto_pagina(page_hash, backend)
+        cache.guardar_pagina(doc_hash, backend, page_num, page_hash, page_text)
+        yield page_text
     
-    return texto_pregunta, []
+    cache.cerrar_documento(doc_hash, backend, len(page_hashes))
+
+
+def extract_pages_from_pdf(pdf_path, workers=1, cache=None, backend=None):
+    """Extrae el texto de cada página del PDF, en orden (ver iter_pages_from_pdf)"""
+    return list(iter_pages_from_pdf(pdf_path, workers, cache, backend))
+
+
+def extract_text_from_pdf(pdf_path, workers=1, cache=None, backend=None):
+    """Extrae todo el texto del PDF"""
+    pages = iter_pages_from_pdf(pdf_path, workers, cache, backend)
+    return ''.join(page_text + "\n" for page_text in pages if page_text)
+
+
+def _producir_paginas(pdf_path, workers, cache_dir, backend, cola, detener, error):
+    """Hilo productor: extrae las páginas y las pone en la cola, terminando con _FIN"""
+    try:
+        # La conexión SQLite de la caché se abre en el mismo hilo que la usa
+        with CacheBanco(cache_dir) if cache_dir is not None else nullcontext() as cache:
+            for page_text in iter_pages_from_pdf(pdf_path, workers, cache, backend, en_procesos=True):
+                while not detener.is_set():
+                    try:
+                        cola.put(page_text, timeout=0.1)
+                        break
+                    except queue.Full:
+                        pass
+                if detener.is_set():
+                    return
+    except BaseException as e:
+        error.append(e)
+    finally:
+        cola.put(_FIN)
+
+
+def iter_pages_background(pdf_path, workers=1, cache_dir=None, backend=None, profundidad=PROFUNDIDAD_COLA):
+    """Entrega el texto de cada página mientras un hilo sigue extrayendo las siguientes
+
+    Las páginas se extraen en procesos aparte (uno con workers=1), así el
+    parseo no compite con la extracción por el GIL, y pasan por una cola de
+    como mucho `profundidad` elementos: la extracción se adelanta al parseo
+    sin acumular el documento entero. Un error del hilo productor se vuelve a
+    lanzar aquí.
+    """
+    cola = queue.Queue(maxsize=profundidad)
+    detener = threading.Event()
+    error = []
+    hilo = threading.Thread(target=_producir_paginas, daemon=True,
+                            args=(pdf_path, workers, cache_dir, backend, cola, detener, error))
+    hilo.start()
+    try:
+        while True:
+            page_text = cola.get()
+            if page_text is _FIN:
+                break
+            yield page_text
+    finally:
+        detener.set()
+        # Liberar al productor si está esperando lugar en la cola
+        while hilo.is_alive():
+            try:
+                cola.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        hilo.join()
+    if error:
+        raise error[0]
+
+
+def iter_lines_from_pages(pages, texto_extraido=None):
+    """Divide en líneas el texto de las páginas, igual que extract_text_from_pdf(...).split('\\n')
+
+    Las líneas de una página siguen a las de la anterior sin cortar el estado
+    del parser. Con texto_extraido (un archivo abierto) se va copiando allí el
+    texto de cada página.
+    """
+    for page_text in pages:
+        if page_text:
+            if texto_extraido is not None:
+                texto_extraido.write(page_text + "\n")
+            yield from page_text.split('\n')
+    yield ''
 
 
 def identify_materias_and_preguntas(text):
     """Identifica materias y sus preguntas/respuestas"""
-    lines = text.split('\n')
-    
-    materias = []
-    current_materia = None
-    current_pregunta = None
-    current_respuestas = []
-    
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Limpiar caracteres especiales al inicio (como •)
-        line_clean = re.sub(r'^[•\s]+', '', line)
-        
-        if not line_clean:
-            i += 1
-            continue
-        
-        # Detectar materia: "Banco de Preguntas: [Nombre]" o "Banco de Preguntas [Nombre]" (con o sin dos puntos)
-        materia_match = re.match(r'Banco de Preguntas\s*:?\s*(.+)', line_clean, re.IGNORECASE)
-        # También detectar "BANCO DE PREGUNTAS GENERADO [Nombre]"
-        if not materia_match:
-            materia_match = re.match(r'BANCO DE PREGUNTAS\s+(?:GENERADO\s+)?(.+)', line_clean, re.IGNORECASE)
-        if materia_match:
-            # Guardar materia anterior si existe
-            if current_materia:
-                if current_pregunta:
-                    if current_respuestas:
-                        current_pregunta['respuestas'] = current_respuestas
-                    current_materia['preguntas'].append(current_pregunta)
-                if current_materia['preguntas']:
-                    materias.append(current_materia)
-            
-            # Limpiar el nombre de la materia
-            materia_nombre = materia_match.group(1).strip()
-            # Remover "GENERADO" si está al inicio
-            materia_nombre = re.sub(r'^GENERADO\s+', '', materia_nombre, flags=re.IGNORECASE).strip()
-            # Convertir a formato título (primera letra mayúscula, resto minúsculas)
-            if materia_nombre.isupper() and len(materia_nombre) > 1:
-                materia_nombre = materia_nombre.capitalize()
-            
-            # Nueva materia
-            current_materia = {
-                'materia': materia_nombre,
-                'preguntas': []
-            }
-            current_pregunta = None
-            current_respuestas = []
-            i += 1
-            continue
-        
-        # Detectar pregunta: "Pregunta X:" o "Pregunta X" (con o sin dos puntos)
-        # También detectar preguntas que empiezan solo con número: "1.", "2.", etc.
-        pregunta_match = re.match(r'Pregunta\s+(\d+)[:\s]*(.+)', line_clean, re.IGNORECASE)
-        if not pregunta_match:
-            # Detectar formato "1. texto" o "1 texto" (número seguido de punto o espacio)
-            pregunta_match = re.match(r'^(\d+)[\.\)]\s*(.+)', line_clean)
-        if pregunta_match:
-            # Guardar pregunta anterior
-            if current_pregunta and current_materia:
-                if current_respuestas:
-                    current_pregunta['respuestas'] = current_respuestas
-                current_materia['preguntas'].append(current_pregunta)
-            
-            # Nueva pregunta
-            pregunta_num = pregunta_match.group(1)
-            pregunta_texto = pregunta_match.group(2).strip()
-            
-            # Si no hay texto después de "Pregunta X", la siguiente línea es el texto
-            if not pregunta_texto and i + 1 < len(lines):
-                next_line = lines[i + 1].strip() if i + 1 < len(lines) else ""
-                next_line_clean = re.sub(r'^[•\s]+', '', next_line)
-                # Si la siguiente línea no es una respuesta (no empieza con bullet o A-E:), es parte de la pregunta
-                if next_line_clean and not re.match(r'^[A-E][:]', next_line_clean) and not re.match(r'^\s*[\uf0b7•]', next_line.strip()):
-                    pregunta_texto = next_line_clean
-                    i += 1  # Saltar la siguiente línea ya que la procesamos
-            
-            current_pregunta = {
-                'numero': pregunta_num,
-                'texto': pregunta_texto,
-                'respuestas': []
-            }
-            current_respuestas = []
-            i += 1
-            continue
-        
-        # Detectar respuesta: "A:", "B:", "C:", "D:" (puede tener • antes)
-        # También detectar "a)", "b)", "c)", "d)" (minúsculas con paréntesis)
-        respuesta_match = re.match(r'[•\s]*([A-Ea-e])[:\)]\s*(.+)', line_clean)
-        if respuesta_match:
-            if current_pregunta:
-                # Si hay texto pendiente en la pregunta, agregarlo
-                if current_pregunta['texto'] and not current_pregunta['texto'].endswith(' '):
-                    current_pregunta['texto'] += ' '
-                
-                respuesta_letra = respuesta_match.group(1).upper()  # Convertir a mayúscula
-                respuesta_texto = respuesta_match.group(2).strip()
-                current_respuestas.append({
-                    'opcion': respuesta_letra,
-                    'texto': respuesta_texto
-                })
-            i += 1
-            continue
-        
-        # Detectar respuesta sin letra explícita: solo bullet (• o \uf0b7) seguido de texto
-        # Buscar bullet en la línea original (puede tener espacios antes)
-        if current_pregunta and ('•' in line or '\uf0b7' in line):
-            # Verificar si la línea empieza con bullet (después de espacios opcionales)
-            bullet_match = re.match(r'\s*[\uf0b7•]\s+(.+)', line)
-            if bullet_match:
-                respuesta_texto = bullet_match.group(1).strip()
-                
-                # Determinar la letra de la opción
-                if current_respuestas:
-                    # Inferir la siguiente letra basándose en la última respuesta
-                    ultima_opcion = current_respuestas[-1]['opcion']
-                    siguiente_letra = chr(ord(ultima_opcion) + 1)
-                else:
-                    # Primera respuesta, usar 'A'
-                    siguiente_letra = 'A'
-                
-                if siguiente_letra <= 'E':
-                    current_respuestas.append({
-                        'opcion': siguiente_letra,
-                        'texto': respuesta_texto
-                    })
-                i += 1
-                continue
-        
-        # Texto continuo: parte de pregunta o respuesta
-        if current_pregunta:
-            if current_respuestas:
-                # Agregar a la última respuesta (solo si no empieza con •)
-                if '•' not in line or not re.match(r'\s*[•]', line):
-                    if current_respuestas[-1]['texto'] and not current_respuestas[-1]['texto'].endswith(' '):
-                        current_respuestas[-1]['texto'] += ' '
-                    current_respuestas[-1]['texto'] += line_clean
-            else:
-                # Verificar si la línea contiene bullet al inicio (sería una respuesta, no parte de la pregunta)
-                if ('•' not in line and '\uf0b7' not in line) or not re.match(r'\s*[\uf0b7•]', line):
-                    # Agregar a la pregunta
-                    if current_pregunta['texto'] and not current_pregunta['texto'].endswith(' '):
-                        current_pregunta['texto'] += ' '
-                    current_pregunta['texto'] += line_clean
-        
-        i += 1
-    
-    # Guardar última pregunta y materia
-    if current_pregunta and current_materia:
-        if current_respuestas:
-            current_pregunta['respuestas'] = current_respuestas
-        current_materia['preguntas'].append(current_pregunta)
-    
-    if current_materia and current_materia['preguntas']:
-        materias.append(current_materia)
-    
-    # Post-procesamiento: extraer respuestas incrustadas en el texto de las preguntas
-    for materia in materias:
-        for pregunta in materia['preguntas']:
-            if not pregunta['respuestas'] or len(pregunta['respuestas']) == 0:
-                # Intentar extraer respuestas del texto
-                texto_limpio, respuestas_extraidas = extract_respuestas_from_text(pregunta['texto'])
-                if respuestas_extraidas:
-                    pregunta['texto'] = texto_limpio
-                    pregunta['respuestas'] = respuestas_extraidas
-    
-    return materias
+    return [materia.to_dict() for materia in iter_materias(text.split('\n'), DIALECTO_PDF)]
 
 
-def process_pdf_to_json(pdf_path, output_path):
-    """Procesa el PDF y genera el JSON"""
-    print(f"Extrayendo texto del PDF: {pdf_path}")
-    text = extract_text_from_pdf(pdf_path)
+def process_pdf_to_json(pdf_path, output_path, workers=1, cache_dir=None, formato='json', sqlite_path=None,
+                        profile=False, backend=None, indexado_path=None, delta=False, duplicados=None,
+                        umbral_duplicados=UMBRAL, fragmentos_path=None):
+    """Procesa el PDF y genera el JSON (las opciones de salida son las de banco_writer.abrir_salida)"""
+    backend = obtener_backend(backend).nombre
+    perfil = Perfil() if profile else None
     
-    print("Procesando texto y extrayendo estructura...")
-    # Guardar texto completo primero para análisis
-    with open('texto_extraido.txt', 'w', encoding='utf-8') as f:
-        f.write(text)
-    print("Texto extraído guardado en 'texto_extraido.txt' para referencia")
-    
-    # Identificar estructura
-    materias = identify_materias_and_preguntas(text)
+    with perfil if perfil is not None else nullcontext():
+        print(f"Extrayendo texto del PDF: {pdf_path} (con {backend})")
+        if workers > 1:
+            print(f"Usando {workers} procesos para extraer las páginas")
+        # Las páginas se extraen en un hilo aparte y se parsean a medida que llegan
+        pages = iter_pages_background(pdf_path, workers, cache_dir, backend)
+        if perfil is not None:
+            # Tiempo que el parseo pasa esperando a la extracción
+            pages = perfil.iterar('espera_extraccion', pages)
+        print("Procesando texto y extrayendo estructura...")
+        
+        # Identificar estructura y escribir cada pregunta en cuanto se cierra; el
+        # texto completo se guarda a la vez para análisis
+        with open('texto_extraido.txt', 'w', encoding='utf-8') as texto_extraido, \
+                abrir_salida(output_path, formato, sqlite_path, indexado_path, atomico=True, delta=delta,
+                             duplicados=duplicados, umbral_duplicados=umbral_duplicados,
+                             fragmentos_path=fragmentos_path) as escritor:
+            lines = iter_lines_from_pages(pages, texto_extraido)
+            if perfil is not None:
+                perfil.medir_salida(escritor)
+                preguntas = perfil.iter_preguntas(lines, DIALECTO_PDF)
+            else:
+                preguntas = iter_preguntas(lines, DIALECTO_PDF)
+            for indice_materia, materia_nombre, pregunta in preguntas:
+                escritor.escribir_pregunta(indice_materia, materia_nombre, pregunta)
+        print("Texto extraído guardado en 'texto_extraido.txt' para referencia")
     
-    # Guardar JSON
     output_data = {
-        'banco_preguntas': materias,
-        'total_materias': len(materias),
-        'total_preguntas': sum(len(m['preguntas']) for m in materias)
+        'total_materias': escritor.total_materias,
+        'total_preguntas': escritor.total_preguntas
     }
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
+    imprimir_salidas(escritor, output_path, sqlite_path, indexado_path, fragmentos_path, emoji=False)
+    print(f"Total de materias: {escritor.total_materias}")
+    print(f"Total de preguntas: {escritor.total_preguntas}")
     
-    print(f"\nJSON generado exitosamente: {output_path}")
-    print(f"Total de materias: {len(materias)}")
-    print(f"Total de preguntas: {sum(len(m['preguntas']) for m in materias)}")
+    if perfil is not None:
+        reporte = perfil.guardar(perfil_path(output_path), conversor='pdf', archivo=str(pdf_path),
+                                 salida=str(output_path), workers=workers, backend=backend,
+                                 **output_data)
+        print(f"\nPerfil por etapas guardado en: {perfil_path(output_path)}")
+        imprimir_reporte(reporte)
     
     return output_data
 
@@ -293,19 +316,70 @@ def process_alternative_method(text):
     return identify_materias_and_preguntas(text)
 
 
+def parse_args(argv=None):
+    """Argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Convierte el banco de preguntas PDF a JSON")
+    parser.add_argument('pdf', nargs='?', type=Path,
+                        default=Path("BAnco de Preguntas Examen Complexivo Periodo 2025-2026 (1).pdf"),
+                        help="PDF de entrada")
+    agregar_argumentos_salida(parser)
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                        help="procesos para extraer las páginas en paralelo (por defecto: 1)")
+    parser.add_argument('--cache', type=Path, default=DEFAULT_CACHE_DIR, metavar='DIR',
+                        help=f"directorio de la caché de texto por página (por defecto: {DEFAULT_CACHE_DIR})")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="extraer todas las páginas sin usar la caché")
+    parser.add_argument('--profile', action='store_true',
+                        help="medir tiempo y memoria pico de cada etapa y guardarlos en <salida>.perfil.json")
+    parser.add_argument('--backend', choices=['auto'] + PREFERENCIA, default='auto',
+                        help="librería de PDF (por defecto: la más rápida instalada, en orden "
+                             + ', '.join(PREFERENCIA) + ")")
+    parser.add_argument('--benchmark-backends', action='store_true',
+                        help="comparar la velocidad de extracción de los backends instalados sobre el PDF y salir")
+    return parser.parse_args(argv)
+
+
+def imprimir_comparacion(resultados):
+    """Tabla de comparar_backends"""
+    print(f"{'backend':<12} {'páginas':>8} {'seg':>9} {'páginas/s':>10} {'caracteres':>11}")
+    for r in resultados:
+        print(f"{r['backend']:<12} {r['paginas']:>8} {r['segundos']:>9.3f} "
+              f"{r['paginas_por_segundo'] or 0:>10.1f} {r['caracteres']:>11}")
+
+
 if __name__ == "__main__":
-    pdf_path = Path("BAnco de Preguntas Examen Complexivo Periodo 2025-2026 (1).pdf")
-    output_path = Path("banco_preguntas.json")
+    args = parse_args()
+    pdf_path = args.pdf
+    output_path = args.output
     
     if not pdf_path.exists():
         print(f"Error: No se encontró el archivo PDF: {pdf_path}")
         sys.exit(1)
     
     try:
-        process_pdf_to_json(pdf_path, output_path)
+        backend = obtener_backend(args.backend).nombre
+    except ImportError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    
+    if args.benchmark_backends:
+        imprimir_comparacion(comparar_backends(pdf_path))
+        sys.exit(0)
+    
+    try:
+        process_pdf_to_json(pdf_path, output_path, workers=args.workers,
+                            cache_dir=None if args.no_cache else args.cache,
+                            formato=args.format,
+                            sqlite_path=args.sqlite,
+                            indexado_path=args.indexado,
+                            fragmentos_path=args.fragmentos,
+                            delta=args.delta,
+                            duplicados=args.duplicados,
+                            umbral_duplicados=args.umbral_duplicados,
+                            profile=args.profile,
+                            backend=backend)
     except Exception as e:
         print(f"Error al procesar el PDF: {e}")
         import traceback
         traceback.print_exc()
         sys.exit(1)
-
@@ -570,6 +570,13 @@ app.get('/api/estadisticas', (req, res) => {
     });
 });
 
+// Consulta FTS5 a partir del texto buscado: cada palabra como prefijo ("sist"* encuentra
+// "sistemas"); sin palabras (solo signos) no hay consulta y se usa LIKE
+function consultaIndice(query) {
+    const palabras = query.match(/[\p{L}\p{N}]+/gu) || [];
+    return palabras.map(palabra => `"${palabra}"*`).join(' ');
+}
+
 // Búsqueda de preguntas
 app.get('/api/buscar', (req, res) => {
     const query = req.query.q || '';
@@ -581,47 +588,66 @@ app.get('/api/buscar', (req, res) => {
         return;
     }
     
-    // Construir la consulta base
-    let sql = `SELECT p.*, m.nombre as materia_nombre,
-                (SELECT json_group_array(
-                    json_object('id', r.id, 'opcion', r.opcion, 'texto', r.texto, 'es_correcta', r.es_correcta)
-                ) FROM respuestas r WHERE r.pregunta_id = p.id) as respuestas_json
-         FROM preguntas p
-         JOIN materias m ON p.materia_id = m.id
-         WHERE 1=1`;
-    
-    const params = [];
-    
-    // Si hay query, agregar condición de búsqueda
-    if (query.trim()) {
-        sql += ` AND (p.texto LIKE ? OR m.nombre LIKE ?)`;
-        params.push(`%${query}%`, `%${query}%`);
-    }
-    
-    // Si se solicita solo preguntas sin respuesta correcta
-    if (soloSinRespuesta) {
-        sql += ` AND NOT EXISTS (
-            SELECT 1 FROM respuestas r 
-            WHERE r.pregunta_id = p.id 
-            AND (r.es_correcta = 1 OR r.es_correcta = '1' OR r.es_correcta = true)
-        )`;
-    }
-    
-    sql += ` ORDER BY m.nombre, CAST(p.numero AS INTEGER) LIMIT 50`;
+    // Con el índice preguntas_fts (lo crea la exportación a SQLite de los conversores)
+    // la búsqueda no distingue mayúsculas ni tildes y ordena por relevancia (bm25,
+    // pesando más el texto de la pregunta); si la base de datos no lo tiene se usa LIKE
+    const consulta = query.trim() ? consultaIndice(query) : '';
     
-    db.all(sql, params, (err, rows) => {
-        if (err) {
-            res.status(500).json({ error: err.message });
-            return;
+    const buscar = (usarIndice) => {
+        // Construir la consulta base
+        let sql = `SELECT p.*, m.nombre as materia_nombre,
+                    (SELECT json_group_array(
+                        json_object('id', r.id, 'opcion', r.opcion, 'texto', r.texto, 'es_correcta', r.es_correcta)
+                    ) FROM respuestas r WHERE r.pregunta_id = p.id) as respuestas_json
+             FROM ${usarIndice ? 'preguntas_fts f JOIN preguntas p ON p.id = f.rowid' : 'preguntas p'}
+             JOIN materias m ON p.materia_id = m.id
+             WHERE 1=1`;
+        
+        const params = [];
+        
+        // Si hay query, agregar condición de búsqueda
+        if (usarIndice) {
+            sql += ` AND preguntas_fts MATCH ?`;
+            params.push(consulta);
+        } else if (query.trim()) {
+            sql += ` AND (p.texto LIKE ? OR m.nombre LIKE ?)`;
+            params.push(`%${query}%`, `%${query}%`);
         }
         
-        const resultados = rows.map(row => ({
-            ...row,
-            respuestas: row.respuestas_json ? JSON.parse(row.respuestas_json) : []
-        }));
+        // Si se solicita solo preguntas sin respuesta correcta
+        if (soloSinRespuesta) {
+            sql += ` AND NOT EXISTS (
+                SELECT 1 FROM respuestas r 
+                WHERE r.pregunta_id = p.id 
+                AND (r.es_correcta = 1 OR r.es_correcta = '1' OR r.es_correcta = true)
+            )`;
+        }
         
-        res.json(resultados);
-    });
+        sql += usarIndice
+            ? ` ORDER BY bm25(preguntas_fts, 4.0, 1.0, 2.0) LIMIT 50`
+            : ` ORDER BY m.nombre, CAST(p.numero AS INTEGER) LIMIT 50`;
+        
+        db.all(sql, params, (err, rows) => {
+            if (err) {
+                // Base de datos sin índice (p. ej. cargada con npm run import)
+                if (usarIndice) {
+                    buscar(false);
+                    return;
+                }
+                res.status(500).json({ error: err.message });
+                return;
+            }
+            
+            const resultados = rows.map(row => ({
+                ...row,
+                respuestas: row.respuestas_json ? JSON.parse(row.respuestas_json) : []
+            }));
+            
+            res.json(resultados);
+        });
+    };
+    
+    buscar(consulta !== '');
 });
 
 // Iniciar servidor
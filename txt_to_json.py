@@ -6,223 +6,184 @@ Extrae materias, preguntas y respuestas del archivo TXT
 NO MODIFICA preguntas ni respuestas, solo las extrae
 """
 
-import json
-import re
+import argparse
 import sys
+from contextlib import nullcontext
 from pathlib import Path
 
+import banco_parser
+from banco_cache import DEFAULT_CACHE_DIR, CacheBanco, hash_bytes, version_parser
+from banco_duplicados import UMBRAL
+from banco_lector import LectorTXT
+from banco_parser import DIALECTO_TXT
+from banco_perfil import Perfil, imprimir_reporte, perfil_path
+from banco_writer import abrir_salida, agregar_argumentos_salida, imprimir_salidas
+
+
+def dialecto_txt(respuestas_incrustadas=False):
+    """Dialecto del TXT
+
+    Con respuestas_incrustadas también se separan las opciones con viñeta que
+    quedaron dentro del texto de las preguntas sin respuestas (TXT copiados
+    de un PDF), como en pdf_to_json.
+    """
+    return DIALECTO_TXT._replace(respuestas_incrustadas=True) if respuestas_incrustadas else DIALECTO_TXT
+
+
+def iter_preguntas(lines, dialecto=DIALECTO_TXT):
+    """Entrega cada pregunta del TXT apenas se cierra (ver banco_parser.iter_preguntas)"""
+    return banco_parser.iter_preguntas(lines, dialecto)
+
+
+def iter_materias(lines, dialecto=DIALECTO_TXT, conteo=None):
+    """Entrega cada materia del TXT apenas se cierra (ver banco_parser.iter_materias)"""
+    return banco_parser.iter_materias(lines, dialecto, conteo)
+
 
 def identify_materias_and_preguntas(text):
     """Identifica materias y sus preguntas/respuestas del TXT"""
-    lines = text.split('\n')
-    
-    materias = []
-    current_materia = None
-    current_pregunta = None
-    current_respuestas = []
-    
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Limpiar caracteres especiales al inicio (como •)
-        line_clean = re.sub(r'^[•\s]+', '', line)
-        
-        if not line_clean:
-            i += 1
-            continue
-        
-        # Detectar materia: "Banco de Preguntas: [Nombre]" o "Banco de preguntas: [Nombre]" (case insensitive)
-        materia_match = re.match(r'Banco de [Pp]reguntas\s*:?\s*(.+)', line_clean, re.IGNORECASE)
-        if materia_match:
-            # Guardar materia anterior si existe
-            if current_materia:
-                if current_pregunta:
-                    if current_respuestas:
-                        current_pregunta['respuestas'] = current_respuestas
-                    current_materia['preguntas'].append(current_pregunta)
-                if current_materia['preguntas']:
-                    materias.append(current_materia)
-            
-            # Limpiar el nombre de la materia
-            materia_nombre = materia_match.group(1).strip()
-            # Remover "GENERADO" si está al inicio
-            materia_nombre = re.sub(r'^GENERADO\s+', '', materia_nombre, flags=re.IGNORECASE).strip()
-            # Convertir a formato título (primera letra mayúscula de cada palabra)
-            materia_nombre = materia_nombre.title()
-            # Correcciones específicas
-            if 'Generado Inteligencia Artificial' in materia_nombre or 'Inteligencia Artificial' in materia_nombre:
-                materia_nombre = 'Inteligencia Artificial'
-            
-            # Nueva materia
-            current_materia = {
-                'materia': materia_nombre,
-                'preguntas': []
-            }
-            current_pregunta = None
-            current_respuestas = []
-            i += 1
-            continue
-        
-        # Detectar pregunta: "Pregunta X:" o "Pregunta X" (puede estar solo en una línea)
-        pregunta_match = re.match(r'^Pregunta\s+(\d+)(?:\s*:?\s*(.+))?$', line_clean, re.IGNORECASE)
-        if not pregunta_match:
-            # Detectar formato "1. texto" o "1 texto" (número seguido de punto o espacio)
-            pregunta_match = re.match(r'^(\d+)[\.\)]\s*(.+)', line_clean)
-        if pregunta_match:
-            # Guardar pregunta anterior
-            if current_pregunta and current_materia:
-                if current_respuestas:
-                    current_pregunta['respuestas'] = current_respuestas
-                current_materia['preguntas'].append(current_pregunta)
-            
-            # Nueva pregunta
-            pregunta_num = pregunta_match.group(1)
-            pregunta_texto = pregunta_match.group(2).strip() if pregunta_match.lastindex >= 2 and pregunta_match.group(2) else ""
-            
-            # Si no hay texto después de "Pregunta X", la siguiente línea es el texto
-            if not pregunta_texto and i + 1 < len(lines):
-                next_line = lines[i + 1].strip() if i + 1 < len(lines) else ""
-                next_line_clean = re.sub(r'^[•\s]+', '', next_line)
-                # Si la siguiente línea no es una respuesta (no empieza con A-E:), es parte de la pregunta
-                if next_line_clean and not re.match(r'^[A-E][:]', next_line_clean) and not re.match(r'^\s*[\uf0b7•]', next_line.strip()):
-                    pregunta_texto = next_line_clean
-                    i += 1  # Saltar la siguiente línea ya que la procesamos
-            
-            current_pregunta = {
-                'numero': pregunta_num,
-                'texto': pregunta_texto,
-                'respuestas': []
-            }
-            current_respuestas = []
-            i += 1
-            continue
-        
-        # Detectar respuesta: "A:", "B:", "C:", "D:" (puede tener • antes)
-        # También detectar "a)", "b)", "c)", "d)" (minúsculas con paréntesis)
-        respuesta_match = re.match(r'[•\s]*([A-Ea-e])[:\)]\s*(.+)', line_clean)
-        if respuesta_match:
-            if current_pregunta:
-                respuesta_letra = respuesta_match.group(1).upper()  # Convertir a mayúscula
-                respuesta_texto = respuesta_match.group(2).strip()
-                current_respuestas.append({
-                    'opcion': respuesta_letra,
-                    'texto': respuesta_texto
-                })
-            i += 1
-            continue
-        
-        # Detectar respuesta sin letra explícita: solo bullet (• o \uf0b7) seguido de texto
-        if current_pregunta and ('•' in line or '\uf0b7' in line):
-            # Primero intentar con letra explícita
-            bullet_match = re.match(r'\s*[\uf0b7•]\s+([A-Ea-e])[:\)]\s*(.+)', line)
-            if bullet_match:
-                respuesta_letra = bullet_match.group(1).upper()
-                respuesta_texto = bullet_match.group(2).strip()
-                current_respuestas.append({
-                    'opcion': respuesta_letra,
-                    'texto': respuesta_texto
-                })
-                i += 1
-                continue
-            
-            # Bullet sin letra explícita - asignar letra automáticamente
-            bullet_match = re.match(r'\s*[\uf0b7•]\s+(.+)', line)
-            if bullet_match:
-                respuesta_texto = bullet_match.group(1).strip()
-                
-                # Determinar la letra de la opción
-                if current_respuestas:
-                    ultima_opcion = current_respuestas[-1]['opcion']
-                    siguiente_letra = chr(ord(ultima_opcion) + 1)
-                else:
-                    siguiente_letra = 'A'
-                
-                if siguiente_letra <= 'E':
-                    current_respuestas.append({
-                        'opcion': siguiente_letra,
-                        'texto': respuesta_texto
-                    })
-                i += 1
-                continue
-        
-        # Texto continuo: parte de pregunta o respuesta
-        if current_pregunta:
-            if current_respuestas:
-                # Agregar a la última respuesta (solo si no empieza con •)
-                if '•' not in line or not re.match(r'\s*[•]', line):
-                    if current_respuestas[-1]['texto'] and not current_respuestas[-1]['texto'].endswith(' '):
-                        current_respuestas[-1]['texto'] += ' '
-                    current_respuestas[-1]['texto'] += line_clean
-            else:
-                # Verificar si la línea contiene bullet al inicio (sería una respuesta, no parte de la pregunta)
-                if ('•' not in line and '\uf0b7' not in line) or not re.match(r'\s*[\uf0b7•]', line):
-                    # Agregar a la pregunta
-                    if current_pregunta['texto'] and not current_pregunta['texto'].endswith(' '):
-                        current_pregunta['texto'] += ' '
-                    current_pregunta['texto'] += line_clean
-        
-        i += 1
-    
-    # Guardar última pregunta y materia
-    if current_pregunta and current_materia:
-        if current_respuestas:
-            current_pregunta['respuestas'] = current_respuestas
-        current_materia['preguntas'].append(current_pregunta)
-    
-    if current_materia and current_materia['preguntas']:
-        materias.append(current_materia)
-    
-    return materias
+    return [materia.to_dict() for materia in iter_materias(text.split('\n'))]
 
 
-def process_txt_to_json(txt_path, output_path):
-    """Procesa el TXT y genera el JSON"""
+def iter_materias_incremental(lector, cache, fuente, stats=None, conteo=None, dialecto=DIALECTO_TXT):
+    """Entrega las materias del TXT reutilizando las secciones que no cambiaron
+
+    El texto se divide en las cabeceras "Banco de Preguntas" (ver
+    banco_lector.LectorTXT.secciones) y cada sección se identifica por el
+    hash de sus bytes y de la versión del parser. Solo se decodifican y
+    vuelven a procesar las secciones que no están en la caché; el resultado
+    es idéntico al de una conversión completa. conteo solo incluye las líneas
+    de las secciones procesadas. cache es un banco_cache.CacheBanco o
+    cualquier objeto con materias_seccion, guardar_seccion y podar_secciones.
+    """
+    prefijo = f"txt\0{version_parser()}\0"
+    if dialecto.respuestas_incrustadas:
+        # Con otro dialecto las mismas secciones dan otras materias
+        prefijo += "incrustadas\0"
+    prefijo = prefijo.encode('utf-8')
+    claves = []
+    for inicio, fin in lector.secciones():
+        clave = hash_bytes(prefijo + lector.leer(inicio, fin))
+        claves.append(clave)
+        materias = cache.materias_seccion(clave)
+        if materias is None:
+            materias = list(iter_materias(lector.iter_lineas(inicio, fin), dialecto, conteo))
+            cache.guardar_seccion(clave, fuente, materias)
+            if stats is not None:
+                stats['procesadas'] += 1
+        elif stats is not None:
+            stats['reutilizadas'] += 1
+        yield from materias
+    cache.podar_secciones(fuente, claves)
+
+
+def process_txt_to_json(txt_path, output_path, cache_dir=None, formato='json', sqlite_path=None,
+                        profile=False, indexado_path=None, delta=False, duplicados=None,
+                        umbral_duplicados=UMBRAL, fragmentos_path=None, respuestas_incrustadas=False):
+    """Procesa el TXT y genera el JSON (las opciones de salida son las de banco_writer.abrir_salida)"""
     print(f"Leyendo archivo TXT: {txt_path}")
-    
-    with open(txt_path, 'r', encoding='utf-8') as f:
-        text = f.read()
-    
     print("Procesando texto y extrayendo estructura...")
     
-    # Identificar estructura
-    materias = identify_materias_and_preguntas(text)
+    stats = {'procesadas': 0, 'reutilizadas': 0}
+    cache = CacheBanco(cache_dir) if cache_dir is not None else None
+    perfil = Perfil() if profile else None
+    dialecto = dialecto_txt(respuestas_incrustadas)
+    
+    try:
+        with perfil if perfil is not None else nullcontext(), \
+                LectorTXT(txt_path) as entrada, \
+                abrir_salida(output_path, formato, sqlite_path, indexado_path, atomico=True, delta=delta,
+                             duplicados=duplicados, umbral_duplicados=umbral_duplicados,
+                             fragmentos_path=fragmentos_path) as escritor:
+            if perfil is not None:
+                perfil.medir_salida(escritor)
+            if cache is not None:
+                fuente = str(Path(txt_path).resolve())
+                if perfil is not None:
+                    materias = perfil.iterar('secciones', iter_materias_incremental(
+                        entrada, cache, fuente, stats, perfil.conteo_lineas, dialecto))
+                else:
+                    materias = iter_materias_incremental(entrada, cache, fuente, stats, dialecto=dialecto)
+                for materia in materias:
+                    escritor.escribir_materia(materia)
+            else:
+                if perfil is not None:
+                    preguntas = perfil.iter_preguntas(entrada, dialecto)
+                else:
+                    preguntas = iter_preguntas(entrada, dialecto)
+                for indice_materia, materia_nombre, pregunta in preguntas:
+                    escritor.escribir_pregunta(indice_materia, materia_nombre, pregunta)
+    finally:
+        if cache is not None:
+            cache.close()
     
-    # Guardar JSON
     output_data = {
-        'banco_preguntas': materias,
-        'total_materias': len(materias),
-        'total_preguntas': sum(len(m['preguntas']) for m in materias)
+        'total_materias': escritor.total_materias,
+        'total_preguntas': escritor.total_preguntas
     }
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
-    
-    print(f"\n✅ JSON generado exitosamente: {output_path}")
-    print(f"📊 Total de materias: {len(materias)}")
-    print(f"📊 Total de preguntas: {sum(len(m['preguntas']) for m in materias)}")
+    imprimir_salidas(escritor, output_path, sqlite_path, indexado_path, fragmentos_path)
+    if cache is not None:
+        print(f"♻️  Secciones reutilizadas: {stats['reutilizadas']}, procesadas: {stats['procesadas']}")
+    print(f"📊 Total de materias: {escritor.total_materias}")
+    print(f"📊 Total de preguntas: {escritor.total_preguntas}")
     
     # Mostrar resumen por materia
     print("\n📚 Resumen por materia:")
-    for materia in materias:
-        print(f"  • {materia['materia']}: {len(materia['preguntas'])} preguntas")
+    for materia_nombre, num_preguntas in escritor.resumen:
+        print(f"  • {materia_nombre}: {num_preguntas} preguntas")
+    
+    if perfil is not None:
+        reporte = perfil.guardar(perfil_path(output_path), conversor='txt', archivo=str(txt_path),
+                                 salida=str(output_path), **output_data)
+        print(f"\n⏱️  Perfil por etapas guardado en: {perfil_path(output_path)}")
+        imprimir_reporte(reporte)
     
     return output_data
 
 
+def parse_args(argv=None):
+    """Argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Convierte el banco de preguntas TXT a JSON")
+    parser.add_argument('txt', nargs='?', type=Path,
+                        default=Path("BAnco de Preguntas Examen Complexivo Periodo 2025-2026 (1).txt"),
+                        help="TXT de entrada")
+    agregar_argumentos_salida(parser)
+    parser.add_argument('--respuestas-incrustadas', action='store_true',
+                        help="separar las opciones con viñeta que quedaron dentro del texto de las preguntas sin "
+                             "respuestas, como en pdf_to_json.py (para TXT copiados de un PDF)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="reprocesar solo las materias cuya sección cambió desde la última ejecución")
+    parser.add_argument('--cache', type=Path, default=DEFAULT_CACHE_DIR, metavar='DIR',
+                        help=f"directorio de la caché usada por --incremental (por defecto: {DEFAULT_CACHE_DIR})")
+    parser.add_argument('--profile', action='store_true',
+                        help="medir tiempo y memoria pico de cada etapa y guardarlos en <salida>.perfil.json")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    txt_path = Path("BAnco de Preguntas Examen Complexivo Periodo 2025-2026 (1).txt")
-    output_path = Path("banco_preguntas.json")
+    args = parse_args()
+    txt_path = args.txt
+    output_path = args.output
     
     if not txt_path.exists():
         print(f"❌ Error: No se encontró el archivo TXT: {txt_path}")
         sys.exit(1)
     
     try:
-        process_txt_to_json(txt_path, output_path)
+        process_txt_to_json(txt_path, output_path,
+                            cache_dir=args.cache if args.incremental else None,
+                            formato=args.format,
+                            sqlite_path=args.sqlite,
+                            indexado_path=args.indexado,
+                            fragmentos_path=args.fragmentos,
+                            respuestas_incrustadas=args.respuestas_incrustadas,
+                            delta=args.delta,
+                            duplicados=args.duplicados,
+                            umbral_duplicados=args.umbral_duplicados,
+                            profile=args.profile)
     except Exception as e:
         print(f"❌ Error al procesar el TXT: {e}")
         import traceback
         traceback.print_exc()
         sys.exit(1)
-
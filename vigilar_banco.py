@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modo vigilancia: vuelve a convertir el banco cada vez que se guarda el TXT
+Queda corriendo y revisa el tamaño y la fecha de modificación de los TXT
+cada pocos milisegundos (sin dependencias externas). Pasada una ráfaga de
+guardados reconvierte solo las secciones que cambiaron, con las demás ya
+parseadas en memoria, y reemplaza la salida de forma atómica; con --sqlite
+la base de datos de server.js queda actualizada al instante
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+from banco_lector import LectorTXT
+from banco_duplicados import UMBRAL
+from banco_writer import abrir_salida, agregar_argumentos_salida
+from convertir_lote import combinar_materias, fuentes_banco
+from txt_to_json import iter_materias_incremental
+
+# Cada cuánto se revisan los archivos y cuánto tiempo sin cambios cierra una ráfaga
+INTERVALO = 0.2
+ESPERA = 0.3
+
+
+def firma(path):
+    """Identifica una versión del archivo sin leerlo; None si no existe (p. ej. a mitad de un guardado)"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class CacheMemoria:
+    """Secciones ya convertidas, en memoria (misma interfaz que banco_cache.CacheBanco)"""
+
+    def __init__(self):
+        self._secciones = {}  # clave -> (fuente, materias)
+
+    def materias_seccion(self, clave):
+        seccion = self._secciones.get(clave)
+        return seccion[1] if seccion is not None else None
+
+    def guardar_seccion(self, clave, fuente, materias):
+        self._secciones[clave] = (fuente, materias)
+
+    def podar_secciones(self, fuente, claves_vigentes):
+        claves_vigentes = set(claves_vigentes)
+        for clave in [c for c, (f, _) in self._secciones.items() if f == fuente and c not in claves_vigentes]:
+            del self._secciones[clave]
+
+
+class VigilanteBanco:
+    """Mantiene la salida al día con uno o varios TXT
+
+    Con un solo TXT la salida es idéntica a la de txt_to_json.py; con varios,
+    las materias con el mismo nombre se combinan como en convertir_lote.py.
+    """
+
+    def __init__(self, entradas, output_path, formato='json', sqlite_path=None, indexado_path=None,
+                 fragmentos_path=None, delta=False, duplicados=None, umbral_duplicados=UMBRAL):
+        self.entradas = [Path(e) for e in entradas]
+        self.output_path = Path(output_path)
+        self.formato = formato
+        self.sqlite_path = sqlite_path
+        self.indexado_path = indexado_path
+        self.fragmentos_path = fragmentos_path
+        self.delta = delta
+        self.duplicados = duplicados
+        self.umbral_duplicados = umbral_duplicados
+        self.cache = CacheMemoria()
+        self.firmas = {}     # path -> firma de la última conversión
+        self._materias = {}  # path -> materias de la última conversión
+
+    def cambiados(self):
+        """TXT cuya firma difiere de la de la última conversión"""
+        return [path for path in self.entradas if firma(path) != self.firmas.get(path)]
+
+    def convertir(self):
+        """Reconvierte lo que cambió y reescribe la salida; devuelve estadísticas"""
+        inicio = time.perf_counter()
+        stats = {'procesadas': 0, 'reutilizadas': 0}
+        for path in self.entradas:
+            actual = firma(path)
+            if path in self._materias and actual == self.firmas.get(path):
+                continue
+            try:
+                if actual is None:
+                    raise FileNotFoundError(f"No se encontró el archivo TXT: {path}")
+                with LectorTXT(path) as lector:
+                    self._materias[path] = list(iter_materias_incremental(
+                        lector, self.cache, str(path.resolve()), stats))
+            except Exception:
+                # Con la firma anotada no se reintenta hasta que el archivo vuelva a cambiar
+                self.firmas[path] = actual
+                self._materias.pop(path, None)
+                raise
+            self.firmas[path] = actual
+
+        if len(self.entradas) == 1:
+            materias = self._materias[self.entradas[0]]
+        else:
+            materias = combinar_materias([self._materias[path] for path in self.entradas],
+                                         fuentes_banco(self.entradas))
+        with abrir_salida(self.output_path, self.formato, self.sqlite_path, self.indexado_path,
+                          atomico=True, delta=self.delta, duplicados=self.duplicados,
+                          umbral_duplicados=self.umbral_duplicados,
+                          fragmentos_path=self.fragmentos_path) as escritor:
+            for materia in materias:
+                escritor.escribir_materia(materia)
+
+        stats['total_materias'] = escritor.total_materias
+        stats['total_preguntas'] = escritor.total_preguntas
+        stats['segundos'] = time.perf_counter() - inicio
+        return stats
+
+    def esperar_rafaga(self, espera=ESPERA, intervalo=INTERVALO):
+        """Espera a que los TXT pasen `espera` segundos sin cambiar
+
+        Un archivo que desaparece cuenta como un cambio más: si sigue sin
+        estar al cerrar la ráfaga, la conversión lo informa.
+        """
+        ultimas = [firma(path) for path in self.entradas]
+        quieto_desde = time.monotonic()
+        while time.monotonic() - quieto_desde < espera:
+            time.sleep(min(intervalo, espera))
+            actuales = [firma(path) for path in self.entradas]
+            if actuales != ultimas:
+                ultimas = actuales
+                quieto_desde = time.monotonic()
+
+    def vigilar(self, intervalo=INTERVALO, espera=ESPERA):
+        """Convierte una vez y luego cada vez que se guardan los TXT, hasta Ctrl+C"""
+        self._convertir_e_informar()
+        print(f"👀 Vigilando {', '.join(str(p) for p in self.entradas)} (Ctrl+C para salir)")
+        while True:
+            time.sleep(intervalo)
+            cambiados = self.cambiados()
+            if cambiados:
+                print(f"\n🔄 Cambios en: {', '.join(str(p) for p in cambiados)}")
+                self.esperar_rafaga(espera, intervalo)
+                self._convertir_e_informar()
+
+    def _convertir_e_informar(self):
+        try:
+            stats = self.convertir()
+        except Exception as e:
+            # Un guardado a medias (p. ej. UTF-8 cortado) no detiene la vigilancia:
+            # la salida anterior queda intacta y se reintenta en el próximo cambio
+            print(f"❌ Error al convertir: {e}")
+            return None
+        print(f"✅ {self.output_path} actualizado en {stats['segundos']:.2f} s: "
+              f"{stats['total_materias']} materias, {stats['total_preguntas']} preguntas "
+              f"(secciones reutilizadas: {stats['reutilizadas']}, procesadas: {stats['procesadas']})")
+        return stats
+
+
+def parse_args(argv=None):
+    """Argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(
+        description="Vigila los TXT del banco y reconvierte cada vez que se guardan")
+    parser.add_argument('txt', nargs='*', type=Path,
+                        default=[Path("BAnco de Preguntas Examen Complexivo Periodo 2025-2026 (1).txt")],
+                        help="TXT a vigilar (con varios, las materias con el mismo nombre se combinan)")
+    agregar_argumentos_salida(parser)
+    parser.add_argument('--intervalo', type=float, default=INTERVALO, metavar='SEG',
+                        help=f"cada cuántos segundos se revisan los archivos (por defecto: {INTERVALO})")
+    parser.add_argument('--espera', type=float, default=ESPERA, metavar='SEG',
+                        help=f"segundos sin cambios que cierran una ráfaga de guardados (por defecto: {ESPERA})")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    for txt_path in args.txt:
+        if not txt_path.exists():
+            print(f"❌ Error: No se encontró el archivo TXT: {txt_path}")
+            sys.exit(1)
+
+    vigilante = VigilanteBanco(args.txt, args.output, formato=args.format,
+                               sqlite_path=args.sqlite, indexado_path=args.indexado,
+                               fragmentos_path=args.fragmentos, delta=args.delta,
+                               duplicados=args.duplicados, umbral_duplicados=args.umbral_duplicados)
+    try:
+        vigilante.vigilar(args.intervalo, args.espera)
+    except KeyboardInterrupt:
+        print("\n👋 Vigilancia detenida")